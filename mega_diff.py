@@ -1,24 +1,114 @@
 import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urljoin, urlparse
 import os
+import shutil
+import threading
+import time
+import filecmp
 import hashlib
 from bs4 import BeautifulSoup
+from bs4.dammit import EntitySubstitution
 from bs4.element import Comment
-import difflib
+from bs4.formatter import HTMLFormatter
+import functools
 import html
+import io
+import json
 import re
+import string
 import logging
+import lxml.etree
+import lxml.html
+import mmap
+import multiprocessing
 from jsbeautifier import beautify
 from deepdiff import DeepDiff
 
+try:
+    # Optional C port of difflib.SequenceMatcher with identical results
+    from cdifflib import CSequenceMatcher as SequenceMatcher
+except ImportError:
+    from difflib import SequenceMatcher
+
 # Constants
-CHUNK_SIZE = 8192
+# Largest piece read from a response body per iteration of the download loop
+CHUNK_SIZE = 1024 * 1024
 DATA_URI_PREVIEW_LENGTH = 100
+# C-backed lxml parser; html.parser is pure Python and much slower on large pages
+HTML_PARSER = "lxml"
+# Same as the "minimal" formatter, but without the indentation that
+# normalize_content strips again afterwards
+UNINDENTED_HTML_FORMATTER = HTMLFormatter(
+    entity_substitution=EntitySubstitution.substitute_xml, indent=0
+)
+FILTER_PATTERN_CACHE_SIZE = 8
+URL_JOIN_CACHE_SIZE = 4096
+# Scripts larger than this (in characters) skip jsbeautifier, which is pure
+# Python and takes seconds on large minified bundles
+JS_BEAUTIFY_MAX_SIZE = 500_000
+# Combined size (in bytes, both sides) of the scripts to diff below which they
+# are beautified in-process, since spawning worker processes costs more than
+# it saves; roughly one full-size pair
+JS_PROCESS_POOL_MIN_SIZE = 2 * JS_BEAUTIFY_MAX_SIZE
+MAX_DOWNLOAD_WORKERS = 32
+HTTP_POOL_CONNECTIONS = 16
+HTTP_MAX_RETRIES = 3
+HTTP_RETRY_BACKOFF_FACTOR = 0.3
+HTTP_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# Per-page sidecar holding ETag/Last-Modified validators and Cache-Control
+# freshness for conditional requests
+HTTP_CACHE_FILE_NAME = ".mega_diff_http_cache.json"
+# Digest computed while downloading; matches calculate_file_hash's default so the
+# recorded digests can stand in for hashing the saved files again
+DOWNLOAD_HASH_ALGORITHM = "sha256"
+
+# Report CSS class for a diff line, keyed on its first character
+DIFF_LINE_CLASSES = {"+": "diff-added", "-": "diff-removed"}
+
+# Precompiled regular expressions
+CSS_URL_PATTERN = re.compile(r"""url\(\s*["']?(.*?)["']?\s*\)""")
+BACKGROUND_IMAGE_PATTERN = re.compile(
+    r"""background-image:\s*url\(\s*["']?(.*?)["']?\s*\)""", re.IGNORECASE
+)
+CSS_COMMENT_PATTERN = re.compile(r"/\*.*?\*/", re.DOTALL)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+PROTOCOL_PATTERN = re.compile(r"https?://")
+WP_VERSION_PATTERN = re.compile(r"\?ver=[0-9.]+")
+JS_STATEMENT_BREAK_PATTERN = re.compile(r"([{};])")
+# The URL of each comma-separated srcset candidate, without its descriptor
+SRCSET_URL_PATTERN = re.compile(r"(?:^|,)\s*([^\s,]+)")
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Directories already created during this run
+_created_dirs = set()
+# Saved file path -> DOWNLOAD_HASH_ALGORITHM digest of the content written there
+_download_hashes = {}
+# Guards claiming URLs in a url_cache shared between concurrent page scrapes
+_url_cache_lock = threading.Lock()
+# Saved file path -> lock serializing the writes to that file
+_save_path_locks = {}
+_save_path_locks_lock = threading.Lock()
+# Worker pool shared by every download batch, created on first use
+_download_executor = None
+_download_executor_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=URL_JOIN_CACHE_SIZE)
+def _join_url(base_url, url):
+    """Resolves a URL against a base URL, caching repeated references.
+
+    Pages and stylesheets refer to the same images (sprites, icons, fonts)
+    many times over, so most of these joins are repeats.
+    """
+    return urljoin(base_url, url)
+
 
 def _get_file_extension_from_content_type(content_type):
     """Determines file extension based on content type."""
@@ -33,6 +123,13 @@ def _get_file_extension_from_content_type(content_type):
     return "bin"
 
 
+def _ensure_dir(path):
+    """Creates a directory (and parents) once per run, skipping known directories."""
+    if path not in _created_dirs:
+        os.makedirs(path, exist_ok=True)
+        _created_dirs.add(path)
+
+
 def _determine_file_name_and_path(url, base_dir, content_type=None):
     """Determines the appropriate file name and save path for a URL."""
     parsed_url = urlparse(url)
@@ -47,7 +144,7 @@ def _determine_file_name_and_path(url, base_dir, content_type=None):
         url_path_dir += "/"
 
     save_dir = os.path.join(base_dir, url_path_dir)
-    os.makedirs(save_dir, exist_ok=True)
+    _ensure_dir(save_dir)
 
     if not file_name or file_name.endswith("/"):
         # Assign a default filename based on content type or a generic one
@@ -68,266 +165,726 @@ def _determine_file_name_and_path(url, base_dir, content_type=None):
     return os.path.join(save_dir, file_name)
 
 
-def _fetch_and_save_resource(url, session, base_dir):
+def _create_session():
+    """Creates a requests Session with a connection pool sized for concurrent downloads.
+
+    Returns:
+        A requests Session whose HTTP and HTTPS adapters keep up to
+        MAX_DOWNLOAD_WORKERS connections alive per host and retry transient errors.
+    """
+    # requests advertises "br" in Accept-Encoding and decodes it transparently
+    # whenever the brotli package is installed (see requirements.txt)
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=MAX_DOWNLOAD_WORKERS,
+        max_retries=Retry(
+            total=HTTP_MAX_RETRIES,
+            backoff_factor=HTTP_RETRY_BACKOFF_FACTOR,
+            status_forcelist=HTTP_RETRY_STATUS_CODES,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _fetch_and_save_resource(
+    url, session, base_dir, return_content=False, http_cache=None, revalidate=False
+):
     """Fetches a resource and saves it to the specified base directory.
 
     Args:
         url: The URL of the resource to fetch.
         session: The requests Session object for connection pooling.
         base_dir: The directory where the resource will be saved.
+        return_content: If True, also keep the downloaded bytes in memory so the
+            caller does not have to read the saved file back.
+        http_cache: Optional dictionary of validators from earlier runs (see
+            _load_http_cache). When it holds an entry for url whose file is
+            still on disk with the recorded size and digest, that file is reused without a
+            request while the entry is fresh per Cache-Control max-age;
+            otherwise the request is made conditional and a 304 reuses the
+            file. The entry is refreshed after a successful download or
+            revalidation.
+        revalidate: If True, a cached entry is revalidated with a conditional
+            request even while it is still fresh.
 
     Returns:
         The file path where the resource was saved, or None if fetch failed.
+        If return_content is True, a (path, content, encoding) tuple instead, where
+        encoding is the charset declared by the server or None; on failure all
+        three are None.
     """
+    cached = http_cache.get(url) if http_cache is not None else None
+    if cached and not _is_cached_file_intact(cached):
+        cached = None
+    if cached and not revalidate and (cached.get("expires") or 0) > time.time():
+        logger.info("Fresh in cache: %s, reusing %s", url, cached["path"])
+        return _reuse_cached_resource(cached, return_content)
     try:
-        response = session.get(url, stream=True)
+        response = session.get(
+            url, stream=True, headers=_conditional_request_headers(cached)
+        )
         logger.debug("Fetching %s", url)
         response.raise_for_status()
         logger.debug("Status Code for %s: %d", url, response.status_code)
 
+        if cached and response.status_code == 304:
+            logger.info("Not modified: %s, reusing %s", url, cached["path"])
+            cached["expires"] = _freshness_expiry(response)
+            return _reuse_cached_resource(cached, return_content)
+
         content_type = response.headers.get("Content-Type", "").lower()
         save_path = _determine_file_name_and_path(url, base_dir, content_type)
 
-        with open(save_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
-                f.write(chunk)
+        content = bytearray() if return_content else None
+        hasher = hashlib.new(DOWNLOAD_HASH_ALGORITHM)
+        with _save_path_lock(save_path):
+            _download_hashes.pop(save_path, None)
+            with open(save_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+                    hasher.update(chunk)
+                    if return_content:
+                        content += chunk
+            _download_hashes[save_path] = hasher.hexdigest()
+            encoding = response.encoding if "charset=" in content_type else None
+            # Recorded under the lock so the size and digest describe this write
+            if http_cache is not None:
+                _update_http_cache(http_cache, url, response, save_path, encoding)
         logger.info("Downloaded: %s to %s", url, save_path)
+        if return_content:
+            return save_path, bytes(content), encoding
         return save_path
     except requests.exceptions.RequestException as e:
         logger.error("Error fetching %s: %s", url, e)
+        return (None, None, None) if return_content else None
+
+
+def _save_path_lock(save_path):
+    """Returns the lock serializing writes to a save path.
+
+    URLs that differ only in their query string are saved to the same file, so
+    concurrent downloads of them would otherwise interleave their bytes there
+    and leave a recorded digest that matches neither response.
+    """
+    with _save_path_locks_lock:
+        return _save_path_locks.setdefault(save_path, threading.Lock())
+
+
+def _is_cached_file_intact(cached):
+    """Checks that a cached resource's file still has the content it was saved with.
+
+    The size is compared first so most changed files are rejected without being
+    read. Entries from runs that did not record a size and digest are not
+    trusted, nor are digests recorded with another algorithm.
+    """
+    if cached.get("hash_algorithm") != DOWNLOAD_HASH_ALGORITHM:
+        return False
+    try:
+        if os.path.getsize(cached["path"]) != cached.get("size"):
+            return False
+        file_hash = calculate_file_hash(cached["path"], DOWNLOAD_HASH_ALGORITHM)
+    except OSError:
+        return False
+    return file_hash == cached.get("hash")
+
+
+def _reuse_cached_resource(cached, return_content):
+    """Returns a previously downloaded resource in _fetch_and_save_resource's format.
+
+    Args:
+        cached: The http_cache entry for the resource.
+        return_content: If True, also read the file's bytes.
+
+    Returns:
+        The cached file path, or a (path, content, encoding) tuple if
+        return_content is True.
+    """
+    _download_hashes[cached["path"]] = cached["hash"]
+    if return_content:
+        with open(cached["path"], "rb") as f:
+            return cached["path"], f.read(), cached.get("encoding")
+    return cached["path"]
+
+
+def _freshness_expiry(response):
+    """Computes until when a response may be reused without revalidation.
+
+    Args:
+        response: The requests Response.
+
+    Returns:
+        The expiry as a Unix timestamp from Cache-Control max-age (less the Age
+        header), or None if the response must be revalidated on every use.
+    """
+    directives = {}
+    for directive in response.headers.get("Cache-Control", "").lower().split(","):
+        name, _, value = directive.strip().partition("=")
+        directives[name] = value.strip('"')
+    if "no-cache" in directives or "no-store" in directives:
+        return None
+    try:
+        max_age = int(directives["max-age"])
+    except (KeyError, ValueError):
+        return None
+    try:
+        age = int(response.headers.get("Age", 0))
+    except ValueError:
+        age = 0
+    return time.time() + max_age - age if max_age > age else None
+
+
+def _conditional_request_headers(cached):
+    """Builds the conditional request headers for a cached resource.
+
+    Args:
+        cached: The http_cache entry for the resource, or None.
+
+    Returns:
+        A dictionary of If-None-Match/If-Modified-Since headers, or None if the
+        resource has no usable validators.
+    """
+    if not cached:
         return None
+    headers = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+    return headers or None
+
+
+def _update_http_cache(http_cache, url, response, save_path, encoding):
+    """Records the validators and freshness of a downloaded resource in http_cache.
+
+    Resources served without an ETag, Last-Modified or max-age are dropped from
+    the cache, since they can be neither reused nor requested conditionally.
+    Must be called while holding the save path's lock, right after the write.
+    """
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    expires = _freshness_expiry(response)
+    if etag or last_modified or expires:
+        http_cache[url] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "expires": expires,
+            "path": save_path,
+            "size": os.path.getsize(save_path),
+            "encoding": encoding,
+            "hash": _download_hashes.get(save_path),
+            "hash_algorithm": DOWNLOAD_HASH_ALGORITHM,
+        }
+    else:
+        http_cache.pop(url, None)
+
+
+def _load_http_cache(page_dir):
+    """Loads the conditional request validators saved by a previous run.
+
+    Args:
+        page_dir: The directory the page's resources are saved to.
+
+    Returns:
+        A dictionary mapping URLs to their validators, empty if none were saved.
+        Saved paths are relative to page_dir and are resolved against it, so the
+        cache stays valid when the tool is run from another directory.
+    """
+    cache_path = os.path.join(page_dir, HTTP_CACHE_FILE_NAME)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            http_cache = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable HTTP cache %s: %s", cache_path, e)
+        return {}
+    if not isinstance(http_cache, dict):
+        return {}
+    return {
+        url: dict(cached, path=os.path.join(page_dir, cached["path"]))
+        for url, cached in http_cache.items()
+        if isinstance(cached, dict) and isinstance(cached.get("path"), str)
+    }
+
+
+def _save_http_cache(page_dir, http_cache):
+    """Saves the conditional request validators for the next run."""
+    cache_path = os.path.join(page_dir, HTTP_CACHE_FILE_NAME)
+    saved = {
+        url: dict(cached, path=os.path.relpath(cached["path"], page_dir))
+        for url, cached in http_cache.items()
+    }
+    try:
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(saved, f, indent=2, sort_keys=True)
+    except OSError as e:
+        logger.warning("Could not save HTTP cache %s: %s", cache_path, e)
+
+
+def _fetch_and_save_resources(urls, session, base_dir, url_cache, http_cache=None):
+    """Fetches several resources concurrently and saves them to the base directory.
+
+    Each URL is fetched at most once: repeated URLs within the batch, and URLs
+    already claimed by an earlier batch, reuse the download recorded in
+    url_cache. The cache may be shared by the scrapes of both pages; a resource
+    downloaded by the other page (e.g. a shared CDN script) is waited for and
+    copied into base_dir instead of being fetched again.
+
+    Args:
+        urls: List of resource URLs to fetch.
+        session: The requests Session object for connection pooling.
+        base_dir: The directory where the resources will be saved.
+        url_cache: Dictionary mapping claimed URLs to a (future, base_dir) tuple,
+            where the future resolves to the saved path (None for failed
+            fetches); updated with the new fetches.
+        http_cache: Optional conditional request validators, passed on to
+            _fetch_and_save_resource.
+
+    Returns:
+        A list of saved file paths (None for failed fetches), in the order of urls.
+    """
+    unique_urls = list(dict.fromkeys(urls))
+    new_urls = [url for url in unique_urls if url not in url_cache]
+    if new_urls:
+        executor = _get_download_executor()
+        with _url_cache_lock:
+            for url in new_urls:
+                if url not in url_cache:
+                    future = executor.submit(
+                        _fetch_and_save_resource,
+                        url,
+                        session,
+                        base_dir,
+                        False,
+                        http_cache,
+                    )
+                    url_cache[url] = (future, base_dir)
+
+    saved_paths = {}
+    for url in unique_urls:
+        future, source_dir = url_cache[url]
+        saved_path = future.result()
+        if saved_path and source_dir != base_dir:
+            saved_path = _copy_download(saved_path, source_dir, base_dir)
+        saved_paths[url] = saved_path
+    return [saved_paths[url] for url in urls]
 
 
-def scrape_page(url, output_dir):
+def _get_download_executor():
+    """Returns the thread pool that runs all resource downloads.
+
+    A single pool of MAX_DOWNLOAD_WORKERS threads serves every batch of both
+    page scrapes, so threads are started once per run rather than per batch,
+    and the total number of concurrent downloads stays bounded.
+    """
+    global _download_executor
+    with _download_executor_lock:
+        if _download_executor is None:
+            _download_executor = ThreadPoolExecutor(
+                max_workers=MAX_DOWNLOAD_WORKERS, thread_name_prefix="download"
+            )
+        return _download_executor
+
+
+def _copy_download(source_path, source_dir, base_dir):
+    """Copies a resource downloaded under another page directory into base_dir.
+
+    Args:
+        source_path: Path of the downloaded file.
+        source_dir: The page directory the file was downloaded to.
+        base_dir: The page directory to copy the file into.
+
+    Returns:
+        The path of the copy, or None if copying failed.
+    """
+    dest_path = os.path.join(base_dir, os.path.relpath(source_path, source_dir))
+    try:
+        _ensure_dir(os.path.dirname(dest_path))
+        with _save_path_lock(dest_path):
+            shutil.copyfile(source_path, dest_path)
+            if source_path in _download_hashes:
+                _download_hashes[dest_path] = _download_hashes[source_path]
+    except OSError as e:
+        logger.error("Error copying %s to %s: %s", source_path, dest_path, e)
+        return None
+    logger.info("Reused: %s as %s", source_path, dest_path)
+    return dest_path
+
+
+def _append_downloaded_paths(paths, downloaded_files, kind):
+    """Appends successfully downloaded paths to the given downloaded_files list."""
+    downloaded_files[kind].extend(path for path in paths if path)
+
+
+def scrape_page(url, output_dir, session=None, url_cache=None, revalidate=False):
     """Scrapes a web page, downloads its resources, and returns paths to downloaded files.
 
     Args:
         url: The URL of the page to scrape.
         output_dir: The directory where downloaded resources will be stored.
+        session: Optional requests Session to download with, so several scrapes
+            can share its kept-alive connections. A new one is created if omitted.
+        url_cache: Optional dictionary of claimed resource downloads (see
+            _fetch_and_save_resources), shared between scrapes so resources
+            used by several pages are downloaded once.
+        revalidate: If True, resources cached by earlier runs are revalidated
+            with the server even while still fresh. The page itself always is,
+            so a fixed page is never compared from a stale copy.
 
     Returns:
         A dictionary containing paths to downloaded HTML, CSS, JS, and image files.
+        When the HTML was downloaded, its raw bytes and declared charset are also
+        kept under 'html_content' and 'html_encoding' so it does not have to be
+        read back for comparison.
     """
     logger.info("Scraping %s...", url)
-    session = requests.Session()
+    if session is None:
+        session = _create_session()
     downloaded_files = {"html": None, "css": [], "js": [], "images": []}
+    if url_cache is None:
+        url_cache = {}
 
     url_hostname = urlparse(url).hostname
     page_dir = os.path.join(output_dir, url_hostname)
-    os.makedirs(page_dir, exist_ok=True)
-
-    html_path = _fetch_and_save_resource(url, session, page_dir)
+    _ensure_dir(page_dir)
+    http_cache = _load_http_cache(page_dir)
+    if revalidate:
+        # Earlier responses then only serve as validators for conditional requests
+        for cached in http_cache.values():
+            cached["expires"] = None
+
+    html_path, html_content, html_encoding = _fetch_and_save_resource(
+        url,
+        session,
+        page_dir,
+        return_content=True,
+        http_cache=http_cache,
+        revalidate=True,
+    )
     if html_path:
         downloaded_files["html"] = html_path
-        with open(html_path, "r", encoding="utf-8") as f:
-            soup = BeautifulSoup(f.read(), "html.parser")
-
-        _download_css_files(soup, url, session, page_dir, downloaded_files)
-        _download_js_files(soup, url, session, page_dir, downloaded_files)
-        _download_image_files(soup, url, session, page_dir, downloaded_files)
+        downloaded_files["html_content"] = html_content
+        downloaded_files["html_encoding"] = html_encoding
+        # Resources are located with lxml directly, which parses far faster than
+        # building a BeautifulSoup tree; the soup is only built for comparison
+        root = _parse_html_tree(html_content, html_encoding)
+
+        css_urls, entries = _collect_page_entries(root, url)
+        _download_css_files(
+            css_urls, session, page_dir, downloaded_files, url_cache, http_cache
+        )
+        _download_entries(
+            entries, session, page_dir, downloaded_files, url_cache, http_cache
+        )
 
+    _save_http_cache(page_dir, http_cache)
     return downloaded_files
 
 
-def _download_css_files(soup, base_url, session, page_dir, downloaded_files):
-    """Finds and downloads CSS files, and images referenced within them."""
-    for link in soup.find_all("link", rel="stylesheet"):
-        href = link.get("href")
-        if href:
-            css_url = urljoin(base_url, href)
-            css_path = _fetch_and_save_resource(css_url, session, page_dir)
-            if css_path:
-                downloaded_files["css"].append(css_path)
-                _download_images_from_css(
-                    css_path, css_url, session, page_dir, downloaded_files
-                )
+def _parse_html_tree(html_content, encoding=None):
+    """Parses HTML bytes into an lxml element tree for locating resources.
 
+    Args:
+        html_content: The raw HTML bytes.
+        encoding: The charset declared by the server, or None to detect it. A
+            charset lxml does not know is ignored and detected instead.
+
+    Returns:
+        The root lxml element of the document (an empty <html> element if the
+        document has no content).
+    """
+    try:
+        parser = lxml.html.HTMLParser(encoding=encoding)
+    except LookupError:
+        logger.warning("Unknown charset %s, detecting the encoding instead", encoding)
+        parser = lxml.html.HTMLParser()
+    try:
+        return lxml.html.document_fromstring(html_content, parser=parser)
+    except lxml.etree.ParserError:
+        return lxml.html.Element("html")
 
-def _download_images_from_css(css_path, css_url, session, page_dir, downloaded_files):
-    """Parses a CSS file for image URLs and downloads them.
+
+def _download_entries(
+    entries, session, page_dir, downloaded_files, url_cache, http_cache=None
+):
+    """Downloads collected resource entries in a single concurrent batch.
 
     Args:
-        css_path: Local path to the CSS file.
-        css_url: Original URL of the CSS file (for resolving relative URLs).
+        entries: List of (kind, value) tuples, where kind is a downloaded_files key
+            ('js' or 'images') and value is an absolute URL, or kind is 'data_uri'
+            and value is the inline data URI.
         session: The requests Session object.
-        page_dir: The directory where images will be saved.
+        page_dir: The directory where resources will be saved.
         downloaded_files: Dictionary to store downloaded file paths.
+        url_cache: Dictionary of claimed resource downloads.
+        http_cache: Optional conditional request validators from earlier runs.
+    """
+    urls = [value for kind, value in entries if kind != "data_uri"]
+    paths = iter(
+        _fetch_and_save_resources(urls, session, page_dir, url_cache, http_cache)
+    )
+    # Entries are recorded in document order so data URI names stay stable.
+    for kind, value in entries:
+        if kind == "data_uri":
+            data_uri_name = f"data_uri_image_{len(downloaded_files['images'])}"
+            downloaded_files["images"].append(
+                {"type": "data_uri", "name": data_uri_name, "content": value}
+            )
+        else:
+            path = next(paths)
+            if path:
+                downloaded_files[kind].append(path)
+
+
+def _download_css_files(
+    css_urls, session, page_dir, downloaded_files, url_cache, http_cache=None
+):
+    """Downloads CSS files, and images referenced within them."""
+    css_paths = _fetch_and_save_resources(
+        css_urls, session, page_dir, url_cache, http_cache
+    )
+    css_img_urls = []
+    for css_url, css_path in zip(css_urls, css_paths):
+        if css_path:
+            downloaded_files["css"].append(css_path)
+            css_img_urls.extend(_find_image_urls_in_css(css_path, css_url))
+    img_paths = _fetch_and_save_resources(
+        css_img_urls, session, page_dir, url_cache, http_cache
+    )
+    _append_downloaded_paths(img_paths, downloaded_files, "images")
+
+
+def _find_image_urls_in_css(css_path, css_url):
+    """Parses a CSS file for image URLs.
+
+    Args:
+        css_path: Local path to the CSS file.
+        css_url: Original URL of the CSS file (for resolving relative URLs).
+
+    Returns:
+        A list of absolute image URLs referenced by the CSS file.
     """
     try:
-        with open(css_path, "r", encoding="utf-8") as f:
-            css_content = f.read()
-        css_image_urls = re.findall(r'url(["\\]?(.*?)["\\]?)', css_content)
-        for css_img_rel_url in css_image_urls:
-            css_img_url = urljoin(css_url, css_img_rel_url)
-            img_path = _fetch_and_save_resource(css_img_url, session, page_dir)
-            if img_path:
-                downloaded_files["images"].append(img_path)
+        css_content = _read_text_file(css_path)
+        css_image_urls = CSS_URL_PATTERN.findall(css_content)
+        return [
+            _join_url(css_url, css_img_rel_url)
+            for css_img_rel_url in css_image_urls
+            if css_img_rel_url and not css_img_rel_url.startswith("data:")
+        ]
     except Exception as e:
         logger.error("Error parsing CSS for images %s: %s", css_path, e)
+        return []
 
 
-def _download_js_files(soup, base_url, session, page_dir, downloaded_files):
-    """Finds and downloads JavaScript files."""
-    for script in soup.find_all("script", src=True):
-        src = script.get("src")
-        if src:
-            js_url = urljoin(base_url, src)
-            js_path = _fetch_and_save_resource(js_url, session, page_dir)
-            if js_path:
-                downloaded_files["js"].append(js_path)
+def _collect_page_entries(root, base_url):
+    """Finds stylesheets, scripts and images to download in one document walk.
 
+    Image entries are grouped by source (<img> tags, <picture> sources, inline
+    styles, SVG sprites) so data URI names match the order used by earlier
+    versions.
 
-def _download_image_files(soup, base_url, session, page_dir, downloaded_files):
-    """Finds and downloads images from various HTML attributes and inline styles."""
-    _download_images_from_img_tags(soup, base_url, session, page_dir, downloaded_files)
-    _download_images_from_picture_elements(
-        soup, base_url, session, page_dir, downloaded_files
-    )
-    _download_images_from_inline_styles(
-        soup, base_url, session, page_dir, downloaded_files
+    Args:
+        root: The root lxml element of the page.
+        base_url: Base URL for resolving relative URLs.
+
+    Returns:
+        A tuple (css_urls, entries) of the absolute stylesheet URLs and the
+        ('js', url), ('images', url) and ('data_uri', uri) entries, scripts first.
+    """
+    css_urls = []
+    js_entries = []
+    img_entries = []
+    picture_entries = []
+    style_entries = []
+    sprite_entries = []
+    for element in root.iter(lxml.etree.Element):
+        tag = element.tag
+        if tag == "link":
+            href = element.get("href")
+            if href and "stylesheet" in (element.get("rel") or "").split():
+                css_urls.append(_join_url(base_url, href))
+        elif tag == "script":
+            src = element.get("src")
+            if src:
+                js_entries.append(("js", _join_url(base_url, src)))
+        elif tag == "img":
+            img_entries.extend(_collect_images_from_img_tag(element, base_url))
+        elif (
+            tag == "source" and next(element.iterancestors("picture"), None) is not None
+        ):
+            picture_entries.extend(
+                _collect_images_from_srcset(element.get("srcset"), base_url)
+            )
+        elif tag == "use":
+            sprite_entries.extend(_collect_svg_sprite(element, base_url))
+        if element.get("style") is not None:
+            style_entries.extend(_collect_images_from_inline_style(element, base_url))
+    entries = (
+        js_entries + img_entries + picture_entries + style_entries + sprite_entries
     )
-    _download_svg_sprites(soup, base_url, session, page_dir, downloaded_files)
+    return css_urls, entries
 
 
-def _download_images_from_img_tags(soup, base_url, session, page_dir, downloaded_files):
-    """Handles image downloads from <img> tags (src, srcset, data-src).
+def _collect_images_from_img_tag(img, base_url):
+    """Handles images from an <img> tag (src, srcset, data-src).
 
     Args:
-        soup: BeautifulSoup object of the HTML document.
+        img: The <img> lxml element.
         base_url: Base URL for resolving relative URLs.
-        session: The requests Session object.
-        page_dir: The directory where images will be saved.
-        downloaded_files: Dictionary to store downloaded file paths.
+
+    Returns:
+        A list of ('images', url) and ('data_uri', uri) entries.
     """
-    for img in soup.find_all("img"):
-        src = img.get("src")
-        if src:
-            if src.startswith("data:"):
-                logger.debug("Found inline data URI image: %s...", src[:50])
-                data_uri_name = f"data_uri_image_{len(downloaded_files['images'])}"
-                downloaded_files["images"].append(
-                    {"type": "data_uri", "name": data_uri_name, "content": src}
-                )
-            else:
-                img_url = urljoin(base_url, src)
-                img_path = _fetch_and_save_resource(img_url, session, page_dir)
-                if img_path:
-                    downloaded_files["images"].append(img_path)
-
-        # Handle srcset attribute for responsive images
-        srcset = img.get("srcset")
-        if srcset:
-            for src_desc in srcset.split(","):
-                src_part = src_desc.strip().split()[0]
-                if src_part and not src_part.startswith("data:"):
-                    full_srcset_url = urljoin(base_url, src_part)
-                    img_path = _fetch_and_save_resource(
-                        full_srcset_url, session, page_dir
-                    )
-                    if img_path:
-                        downloaded_files["images"].append(img_path)
+    entries = []
+    src = img.get("src")
+    if src:
+        if src.startswith("data:"):
+            logger.debug("Found inline data URI image: %s...", src[:50])
+            entries.append(("data_uri", src))
+        else:
+            entries.append(("images", _join_url(base_url, src)))
+
+    # Handle srcset attribute for responsive images
+    entries.extend(_collect_images_from_srcset(img.get("srcset"), base_url))
+
+    # Handle data-src attribute (lazy loading)
+    data_src = img.get("data-src")
+    if data_src and not data_src.startswith("data:"):
+        entries.append(("images", _join_url(base_url, data_src)))
+    return entries
+
+
+def _collect_images_from_srcset(srcset, base_url):
+    """Handles the image candidates of a srcset attribute value."""
+    if not srcset:
+        return []
+    return [
+        ("images", _join_url(base_url, src_part))
+        for src_part in SRCSET_URL_PATTERN.findall(srcset)
+        if not src_part.startswith("data:")
+    ]
 
-        # Handle data-src attribute (lazy loading)
-        data_src = img.get("data-src")
-        if data_src and not data_src.startswith("data:"):
-            img_url = urljoin(base_url, data_src)
-            img_path = _fetch_and_save_resource(img_url, session, page_dir)
-            if img_path:
-                downloaded_files["images"].append(img_path)
 
+def _collect_images_from_inline_style(element, base_url):
+    """Handles images from an element's inline style (background-image)."""
+    entries = []
+    style_content = element.get("style", "")
+    bg_image_urls = BACKGROUND_IMAGE_PATTERN.findall(style_content)
+    for bg_img_url in bg_image_urls:
+        if bg_img_url and not bg_img_url.startswith("data:"):
+            entries.append(("images", _join_url(base_url, bg_img_url)))
+    return entries
 
-def _download_images_from_picture_elements(
-    soup, base_url, session, page_dir, downloaded_files
-):
-    """Handles image downloads from <picture> elements."""
-    for picture in soup.find_all("picture"):
-        for source in picture.find_all("source"):
-            srcset = source.get("srcset")
-            if srcset:
-                for src_desc in srcset.split(","):
-                    src_part = src_desc.strip().split()[0]
-                    if src_part and not src_part.startswith("data:"):
-                        full_url = urljoin(base_url, src_part)
-                        img_path = _fetch_and_save_resource(full_url, session, page_dir)
-                        if img_path:
-                            downloaded_files["images"].append(img_path)
-
-
-def _download_images_from_inline_styles(
-    soup, base_url, session, page_dir, downloaded_files
-):
-    """Handles image downloads from inline styles (background-image)."""
-    for element in soup.find_all(style=True):
-        style_content = element.get("style", "")
-        bg_image_urls = re.findall(
-            r'background-image:\s*url(["\\]?(.*?)["\\]?)',
-            style_content,
-            re.IGNORECASE,
-        )
-        for bg_img_url in bg_image_urls:
-            if not bg_img_url.startswith("data:"):
-                full_bg_url = urljoin(base_url, bg_img_url)
-                img_path = _fetch_and_save_resource(full_bg_url, session, page_dir)
-                if img_path:
-                    downloaded_files["images"].append(img_path)
-
-
-def _download_svg_sprites(soup, base_url, session, page_dir, downloaded_files):
-    """Handles SVG sprite downloads referenced in <use> elements."""
-    for use in soup.find_all("use"):
-        href = use.get("xlink:href") or use.get("href")
-        if href:
-            if "#" in href:
-                base_url_svg = href.split("#")[0]
-                if base_url_svg:
-                    svg_url = urljoin(base_url, base_url_svg)
-                    svg_path = _fetch_and_save_resource(svg_url, session, page_dir)
-                    if svg_path:
-                        downloaded_files["images"].append(svg_path)
-
-
-def normalize_content(content, content_type):
-    """Normalizes HTML, CSS, or JS content for readability while ignoring insignificant whitespace."""
+
+def _collect_svg_sprite(use, base_url):
+    """Handles an SVG sprite referenced by a <use> element."""
+    href = use.get("xlink:href") or use.get("href")
+    if href and "#" in href:
+        base_url_svg = href.split("#")[0]
+        if base_url_svg:
+            return [("images", _join_url(base_url, base_url_svg))]
+    return []
+
+
+def normalize_content(content, content_type, beautify_js=None):
+    """Normalizes HTML, CSS, or JS content for readability while ignoring insignificant whitespace.
+
+    Args:
+        content: The content string to normalize.
+        content_type: Type of content ('html', 'css' or 'js').
+        beautify_js: Whether JS goes through jsbeautifier rather than the
+            per-statement split. None decides by the content's own size; pass
+            the same value for both sides of a diff so they are split alike.
+
+    Returns:
+        The normalized content.
+    """
     if content_type == "html":
-        soup = BeautifulSoup(content, "html.parser")
-        for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
-            comment.extract()
-        prettified_html = soup.prettify()
-        normalized_lines = [
-            line.strip() for line in prettified_html.splitlines() if line.strip()
-        ]
-        return "\n".join(normalized_lines)
+        return _normalize_html_soup(BeautifulSoup(content, HTML_PARSER))
 
     elif content_type == "css":
         # Remove comments and extra whitespace
-        content = re.sub(r"/\*.*?\*/", "", content, flags=re.DOTALL)
-        content = re.sub(r"\s+", " ", content).strip()
+        content = CSS_COMMENT_PATTERN.sub("", content)
+        content = WHITESPACE_PATTERN.sub(" ", content).strip()
         return content
 
     elif content_type == "js":
+        if beautify_js is None:
+            beautify_js = len(content) <= JS_BEAUTIFY_MAX_SIZE
+        if not beautify_js:
+            # Break large scripts after every statement and brace instead, which
+            # is enough to diff minified bundles line by line
+            split_js = JS_STATEMENT_BREAK_PATTERN.sub("\\1\n", content)
+            return "\n".join(filter(None, map(str.strip, split_js.splitlines())))
         # Use jsbeautifier for consistent JS formatting
         return beautify(content)
 
     return content
 
 
-def calculate_file_hash(filepath, hash_algorithm="md5"):
+def _normalize_html_soup(soup):
+    """Normalizes a parsed HTML document like normalize_content does for HTML.
+
+    Comments are extracted from the soup in place.
+
+    Args:
+        soup: BeautifulSoup object of the HTML document.
+
+    Returns:
+        The prettified HTML, one tag or text node per line, without comments.
+    """
+    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+        comment.extract()
+    prettified_html = soup.prettify(formatter=UNINDENTED_HTML_FORMATTER)
+    # map/filter keep the per-line strip and blank-line removal in C
+    return "\n".join(filter(None, map(str.strip, prettified_html.splitlines())))
+
+
+def calculate_file_hash(filepath, hash_algorithm="sha256"):
     """Calculates the hash of a file.
 
     Args:
         filepath: Path to the file to hash.
-        hash_algorithm: Hash algorithm to use ('md5' or 'sha256').
+        hash_algorithm: Name of a hashlib algorithm (e.g. 'md5' or 'sha256').
 
     Returns:
         The hexadecimal digest of the file hash.
     """
-    hasher = hashlib.md5() if hash_algorithm == "md5" else hashlib.sha256()
+    hasher = hashlib.new(hash_algorithm)
     with open(filepath, "rb") as f:
-        while chunk := f.read(CHUNK_SIZE):
-            hasher.update(chunk)
+        # Empty files cannot be mapped, and hash to the empty digest
+        if os.fstat(f.fileno()).st_size:
+            # A single update over the mapping hashes the file without copying it
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hasher.update(mm)
     return hasher.hexdigest()
 
 
+def _read_text_file(filepath):
+    """Reads a UTF-8 text file, decoding it straight from a memory mapping.
+
+    Newlines are translated the same way as a text-mode open() would.
+
+    Args:
+        filepath: Path to the file to read.
+
+    Returns:
+        The file content as a string.
+    """
+    with open(filepath, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            content = str(mm, "utf-8")
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
 def filter_content_for_diff(content, working_url, broken_url):
     """Filters content to ignore specific differences like domain names, protocols, and WP version numbers in URLs.
 
@@ -339,25 +896,158 @@ def filter_content_for_diff(content, working_url, broken_url):
     Returns:
         Filtered content with domains, protocols, and version numbers normalized.
     """
+    pattern = _filter_pattern(working_url, broken_url)
+    return pattern.sub(_filter_replacement, content)
+
+
+@functools.lru_cache(maxsize=FILTER_PATTERN_CACHE_SIZE)
+def _filter_pattern(working_url, broken_url):
+    """Builds one regex matching protocols, the page hostnames and WP version strings.
+
+    Cached per URL pair, so the URLs are parsed once rather than for every file.
+    The alternatives are left ungrouped: re can then skip ahead to positions
+    where one of them may start, which capturing groups prevent.
+
+    Args:
+        working_url: The URL of the working page.
+        broken_url: The URL of the broken page.
+
+    Returns:
+        A compiled pattern for use with _filter_replacement.
+    """
     working_hostname = urlparse(working_url).hostname
     broken_hostname = urlparse(broken_url).hostname
+    alternatives = [PROTOCOL_PATTERN.pattern]
+    # Longest hostname first so a hostname containing the other is filtered whole
+    hostnames = sorted({h for h in (working_hostname, broken_hostname) if h}, key=len)
+    alternatives.extend(re.escape(h) for h in reversed(hostnames))
+    alternatives.append(WP_VERSION_PATTERN.pattern)
+    return re.compile("|".join(alternatives))
+
+
+def _filter_replacement(match):
+    """Returns the replacement text for a match of a _filter_pattern pattern."""
+    matched_text = match.group()
+    # Neither a hostname nor a version string can end in "://"
+    if matched_text.endswith("://"):
+        return "[FILTERED_PROTOCOL]"
+    # Nor can a hostname start with "?"
+    if matched_text.startswith("?"):
+        return ""
+    return "[FILTERED_DOMAIN]"
+
+
+def _prepare_content_for_diff(
+    content, content_type, working_url, broken_url, beautify_js=None
+):
+    """Normalizes and filters content for diffing.
 
-    filtered_content = content
+    Args:
+        content: The raw content string.
+        content_type: Type of content ('html', 'css' or 'js').
+        working_url: The URL of the working page.
+        broken_url: The URL of the broken page.
+        beautify_js: Passed on to normalize_content.
 
-    filtered_content = re.sub(r"https?://", "[FILTERED_PROTOCOL]", filtered_content)
+    Returns:
+        The normalized content with URL differences filtered out.
+    """
+    normalized_content = normalize_content(content, content_type, beautify_js)
+    return filter_content_for_diff(normalized_content, working_url, broken_url)
 
-    if working_hostname:
-        filtered_content = re.sub(
-            re.escape(working_hostname), "[FILTERED_DOMAIN]", filtered_content
-        )
-    if broken_hostname and broken_hostname != working_hostname:
-        filtered_content = re.sub(
-            re.escape(broken_hostname), "[FILTERED_DOMAIN]", filtered_content
-        )
 
-    filtered_content = re.sub(r"\?ver=[0-9.]+", "", filtered_content)
+def _format_unified_range(start, stop):
+    """Formats a 0-based [start, stop) line range for a unified diff hunk header."""
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def _unified_diff(a_lines, b_lines, fromfile="", tofile="", n=3):
+    """Yields a unified diff of two line lists, like difflib.unified_diff.
+
+    Lines shared at the start and end of both inputs are trimmed (keeping n
+    lines of context) before running SequenceMatcher, whose cost grows much
+    faster than linearly with the number of lines it has to align. For large
+    files with a few changes it only ever sees the changed region.
+
+    The result is a valid patch for the same change, but where lines repeat,
+    the trimmed inputs can be aligned differently from difflib's, so the hunks
+    are not always byte-identical to difflib.unified_diff's.
+
+    Args:
+        a_lines: Lines of the original content, with line endings.
+        b_lines: Lines of the changed content, with line endings.
+        fromfile: Name shown in the '---' header.
+        tofile: Name shown in the '+++' header.
+        n: Number of context lines around each change.
+
+    Yields:
+        The unified diff lines, or nothing if the inputs are equal.
+    """
+    limit = min(len(a_lines), len(b_lines))
+    prefix = 0
+    while prefix < limit and a_lines[prefix] == b_lines[prefix]:
+        prefix += 1
+    if prefix == len(a_lines) == len(b_lines):
+        return
+    suffix = 0
+    while suffix < limit - prefix and a_lines[-1 - suffix] == b_lines[-1 - suffix]:
+        suffix += 1
+
+    offset = max(prefix - n, 0)
+    trimmed_suffix = max(suffix - n, 0)
+    a_end = len(a_lines) - trimmed_suffix
+    b_end = len(b_lines) - trimmed_suffix
+    matcher = SequenceMatcher(None, a_lines[offset:a_end], b_lines[offset:b_end])
+
+    yield f"--- {fromfile}\n"
+    yield f"+++ {tofile}\n"
+    for group in matcher.get_grouped_opcodes(n):
+        first, last = group[0], group[-1]
+        file1_range = _format_unified_range(first[1] + offset, last[2] + offset)
+        file2_range = _format_unified_range(first[3] + offset, last[4] + offset)
+        yield f"@@ -{file1_range} +{file2_range} @@\n"
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for line in matcher.a[i1:i2]:
+                    yield " " + line
+                continue
+            if tag in ("replace", "delete"):
+                for line in matcher.a[i1:i2]:
+                    yield "-" + line
+            if tag in ("replace", "insert"):
+                for line in matcher.b[j1:j2]:
+                    yield "+" + line
+
+
+def _diff_text(working_text, broken_text, fromfile, tofile):
+    """Builds the unified diff of two strings.
+
+    Args:
+        working_text: The working version of the content.
+        broken_text: The broken version of the content.
+        fromfile: Name shown for the working version.
+        tofile: Name shown for the broken version.
 
-    return filtered_content
+    Returns:
+        The unified diff as a single string, empty if the contents are equal.
+    """
+    # Stream diff lines into the buffer instead of collecting them in a list
+    buffer = io.StringIO()
+    buffer.writelines(
+        _unified_diff(
+            working_text.splitlines(keepends=True),
+            broken_text.splitlines(keepends=True),
+            fromfile=fromfile,
+            tofile=tofile,
+        )
+    )
+    return buffer.getvalue()
 
 
 def _create_file_map(file_list):
@@ -381,22 +1071,11 @@ def _format_diff_lines(diff_text):
     Returns:
         HTML-formatted string with colored diff lines.
     """
-    formatted_lines = []
-    for line in diff_text.splitlines(keepends=False):
-        escaped_line_content = html.escape(line)
-        if line.startswith("+"):
-            formatted_lines.append(
-                f'<span class="diff-added">{escaped_line_content}</span>\n'
-            )
-        elif line.startswith("-"):
-            formatted_lines.append(
-                f'<span class="diff-removed">{escaped_line_content}</span>\n'
-            )
-        else:
-            formatted_lines.append(
-                f'<span class="diff-unchanged">{escaped_line_content}</span>\n'
-            )
-    return "".join(formatted_lines)
+    return "".join(
+        f'<span class="{DIFF_LINE_CLASSES.get(line[:1], "diff-unchanged")}">'
+        f"{html.escape(line)}</span>\n"
+        for line in diff_text.splitlines()
+    )
 
 
 def generate_html_report(diff_results, output_path):
@@ -406,22 +1085,21 @@ def generate_html_report(diff_results, output_path):
         diff_results: Dictionary containing diff results for HTML, CSS, JS, and images.
         output_path: Path where the HTML report will be saved.
     """
-    html_template = _get_report_html_template()
-
-    html_diffs_str = _format_html_diffs(diff_results["html"])
-    css_diffs_str = _format_css_diffs(diff_results["css"])
-    js_diffs_str = _format_js_diffs(diff_results["js"])
-    image_diffs_str = _format_image_diffs(diff_results["images"])
-
-    final_html = html_template.format(
-        html_diffs=html_diffs_str,
-        css_diffs=css_diffs_str,
-        js_diffs=js_diffs_str,
-        image_diffs=image_diffs_str,
-    )
+    # Each section is formatted and written in turn rather than assembling the
+    # whole report in memory first
+    sections = {
+        "html_diffs": lambda: _format_html_diffs(diff_results["html"]),
+        "css_diffs": lambda: _format_css_diffs(diff_results["css"]),
+        "js_diffs": lambda: _format_js_diffs(diff_results["js"]),
+        "image_diffs": lambda: _format_image_diffs(diff_results["images"]),
+    }
+    template_parts = string.Formatter().parse(_get_report_html_template())
 
     with open(output_path, "w", encoding="utf-8") as f:
-        f.write(final_html)
+        for literal_text, field_name, _, _ in template_parts:
+            f.write(literal_text)
+            if field_name is not None:
+                f.write(sections[field_name]())
 
 
 def _get_report_html_template():
@@ -489,25 +1167,25 @@ def _format_html_diffs(html_diff_items):
             "</p>"
         )
 
-    result = ""
+    parts = []
     for diff_item in html_diff_items:
         if diff_item["type"] == "html-semantic":
-            result += (
+            parts.append(
                 f"<div class='summary-item'><h3>HTML Semantic Diff (DeepDiff)</h3>"
                 f"<div class='diff-content'><pre>{html.escape(str(diff_item['deepdiff']))}</pre></div>"
             )
             if diff_item["visual"]:
-                result += (
+                parts.append(
                     f"<h4>Visual Diff</h4>"
                     f"<div class='diff-content'>{_format_diff_lines(diff_item['visual'])}</div>"
                 )
-            result += "</div>"
+            parts.append("</div>")
         elif diff_item["type"] == "html-visual":
-            result += (
+            parts.append(
                 f"<div class='summary-item'><h3>HTML Visual Diff</h3>"
                 f"<div class='diff-content'>{_format_diff_lines(diff_item['diff'])}</div></div>"
             )
-    return result
+    return "".join(parts)
 
 
 def _format_css_diffs(css_diff_items):
@@ -522,19 +1200,19 @@ def _format_css_diffs(css_diff_items):
     if not css_diff_items:
         return "<p>No CSS differences found.</p>"
 
-    result = ""
+    parts = []
     for diff_item in css_diff_items:
         if "diff" in diff_item:
-            result += (
+            parts.append(
                 f"<div class='summary-item'><h3>CSS File: {diff_item['file']}</h3>"
                 f"<div class='diff-content'>{_format_diff_lines(diff_item['diff'])}</div></div>"
             )
         else:
-            result += (
+            parts.append(
                 f"<div class='summary-item'><p>CSS File: {diff_item['file']} - "
                 f"{diff_item['status']}</p></div>"
             )
-    return result
+    return "".join(parts)
 
 
 def _format_js_diffs(js_diff_items):
@@ -549,19 +1227,19 @@ def _format_js_diffs(js_diff_items):
     if not js_diff_items:
         return "<p>No JavaScript differences found.</p>"
 
-    result = ""
+    parts = []
     for diff_item in js_diff_items:
         if "diff" in diff_item:
-            result += (
+            parts.append(
                 f"<div class='summary-item'><h3>JavaScript File: {diff_item['file']}</h3>"
                 f"<div class='diff-content'>{_format_diff_lines(diff_item['diff'])}</div></div>"
             )
         else:
-            result += (
+            parts.append(
                 f"<div class='summary-item'><p>JavaScript File: {diff_item['file']} - "
                 f"{diff_item['status']}</p></div>"
             )
-    return result
+    return "".join(parts)
 
 
 def _format_image_diffs(image_diff_items):
@@ -576,10 +1254,10 @@ def _format_image_diffs(image_diff_items):
     if not image_diff_items:
         return "<p>No image differences found.</p>"
 
-    result = ""
+    parts = []
     for diff_item in image_diff_items:
-        result += _format_single_image_diff(diff_item)
-    return result
+        parts.append(_format_single_image_diff(diff_item))
+    return "".join(parts)
 
 
 def _format_single_image_diff(diff_item):
@@ -654,6 +1332,55 @@ def soup_to_dict(soup):
         return str(soup)
 
 
+def _unordered_digest(value):
+    """Hashes a soup_to_dict value so that the order of its lists does not matter.
+
+    Two values with equal digests are equal up to list order, which is exactly
+    what DeepDiff(ignore_order=True) disregards.
+
+    Args:
+        value: A dict, list or string as produced by soup_to_dict.
+
+    Returns:
+        The digest bytes of the value.
+    """
+    if isinstance(value, dict):
+        parts = sorted(
+            hashlib.blake2b(str(key).encode()).digest() + _unordered_digest(item)
+            for key, item in value.items()
+        )
+        kind = b"d"
+    elif isinstance(value, list):
+        parts = sorted(_unordered_digest(item) for item in value)
+        kind = b"l"
+    else:
+        parts = [str(value).encode()]
+        kind = b"s"
+    hasher = hashlib.blake2b(kind)
+    for part in parts:
+        hasher.update(part)
+    return hasher.digest()
+
+
+def _load_html_soup(downloaded_files):
+    """Parses a page's HTML, preferring the bytes kept in memory by scrape_page.
+
+    Args:
+        downloaded_files: Dictionary returned by scrape_page.
+
+    Returns:
+        BeautifulSoup object of the page's HTML document.
+    """
+    html_content = downloaded_files.get("html_content")
+    if html_content is not None:
+        return BeautifulSoup(
+            html_content,
+            HTML_PARSER,
+            from_encoding=downloaded_files.get("html_encoding"),
+        )
+    return BeautifulSoup(_read_text_file(downloaded_files["html"]), HTML_PARSER)
+
+
 def _compare_html(working_files, broken_files, working_url, broken_url, diff_results):
     """Compares HTML content using both semantic (DeepDiff) and visual (unified diff) methods.
 
@@ -666,28 +1393,36 @@ def _compare_html(working_files, broken_files, working_url, broken_url, diff_res
     """
     if not (working_files["html"] and broken_files["html"]):
         return
+    # Byte-identical documents cannot differ semantically or visually, so
+    # neither is parsed or prettified. Pages saved to the same path share one
+    # digest entry, which then says nothing about the content kept in memory
+    if working_files["html"] != broken_files["html"] and (
+        _have_identical_download_hashes(working_files["html"], broken_files["html"])
+    ):
+        logger.info("No HTML Differences Found.")
+        return
 
-    with open(working_files["html"], "r", encoding="utf-8") as f:
-        working_html_content = f.read()
-    with open(broken_files["html"], "r", encoding="utf-8") as f:
-        broken_html_content = f.read()
-
-    normalized_working_html = normalize_content(working_html_content, "html")
-    normalized_broken_html = normalize_content(broken_html_content, "html")
+    working_soup = _load_html_soup(working_files)
+    broken_soup = _load_html_soup(broken_files)
+    # The semantic view is taken first, since normalizing strips the comments
+    working_dict = soup_to_dict(working_soup)
+    broken_dict = soup_to_dict(broken_soup)
 
     filtered_working_html = filter_content_for_diff(
-        normalized_working_html, working_url, broken_url
+        _normalize_html_soup(working_soup), working_url, broken_url
     )
     filtered_broken_html = filter_content_for_diff(
-        normalized_broken_html, working_url, broken_url
+        _normalize_html_soup(broken_soup), working_url, broken_url
     )
 
-    working_soup = BeautifulSoup(working_html_content, "html.parser")
-    broken_soup = BeautifulSoup(broken_html_content, "html.parser")
-    working_dict = soup_to_dict(working_soup)
-    broken_dict = soup_to_dict(broken_soup)
-
-    deepdiff_result = DeepDiff(working_dict, broken_dict, ignore_order=True)
+    # Trees equal up to child order have no differences for DeepDiff either, so
+    # its costly order-insensitive matching only runs when both checks fail
+    deepdiff_result = (
+        DeepDiff(working_dict, broken_dict, ignore_order=True)
+        if working_dict != broken_dict
+        and _unordered_digest(working_dict) != _unordered_digest(broken_dict)
+        else {}
+    )
     if deepdiff_result:
         diff_results["html"].append(
             {
@@ -697,22 +1432,18 @@ def _compare_html(working_files, broken_files, working_url, broken_url, diff_res
             }
         )
 
-    html_diff = list(
-        difflib.unified_diff(
-            filtered_working_html.splitlines(keepends=True),
-            filtered_broken_html.splitlines(keepends=True),
-            fromfile="working.html",
-            tofile="broken.html",
-        )
+    html_diff = _diff_text(
+        filtered_working_html,
+        filtered_broken_html,
+        fromfile="working.html",
+        tofile="broken.html",
     )
 
     if html_diff:
         if diff_results["html"] and diff_results["html"][-1]["type"] == "html-semantic":
-            diff_results["html"][-1]["visual"] = "".join(html_diff)
+            diff_results["html"][-1]["visual"] = html_diff
         else:
-            diff_results["html"].append(
-                {"type": "html-visual", "diff": "".join(html_diff)}
-            )
+            diff_results["html"].append({"type": "html-visual", "diff": html_diff})
             logger.info("HTML Visual Differences Found.")
     elif not deepdiff_result:
         logger.info("No HTML Differences Found.")
@@ -738,32 +1469,124 @@ def _compare_single_text_file(
         broken_url: URL of the broken page.
         results_list: List to append diff results to.
     """
-    with open(working_path, "r", encoding="utf-8") as f:
-        working_content = f.read()
-    with open(broken_path, "r", encoding="utf-8") as f:
-        broken_content = f.read()
+    file_diff = _diff_text_files(
+        working_path, broken_path, file_name, content_type, working_url, broken_url
+    )
+    _record_text_file_diff(file_name, content_type, file_diff, results_list)
+
+
+def _diff_text_files(
+    working_path, broken_path, file_name, content_type, working_url, broken_url
+):
+    """Diffs the normalized and filtered content of two text files.
+
+    This is a top-level function so it can run in a worker process.
 
-    normalized_working = normalize_content(working_content, content_type)
-    normalized_broken = normalize_content(broken_content, content_type)
+    Args:
+        working_path: Path to the working version of the file.
+        broken_path: Path to the broken version of the file.
+        file_name: Name of the file being compared.
+        content_type: Type of content ('css' or 'js').
+        working_url: URL of the working page.
+        broken_url: URL of the broken page.
 
-    filtered_working = filter_content_for_diff(
-        normalized_working, working_url, broken_url
+    Returns:
+        The unified diff text, or an empty string if the files do not differ.
+    """
+    # Files downloaded or read with identical content cannot differ once
+    # normalized, so the normalizing and diffing is skipped for them
+    if _have_identical_download_hashes(working_path, broken_path):
+        return ""
+    working_content = _read_text_file(working_path)
+    broken_content = _read_text_file(broken_path)
+    if working_content == broken_content:
+        return ""
+
+    # Both sides must be normalized the same way, or a script just over the
+    # beautify limit would diff entirely against its beautified counterpart
+    beautify_js = max(len(working_content), len(broken_content)) <= JS_BEAUTIFY_MAX_SIZE
+    filtered_working = _prepare_content_for_diff(
+        working_content, content_type, working_url, broken_url, beautify_js
+    )
+    filtered_broken = _prepare_content_for_diff(
+        broken_content, content_type, working_url, broken_url, beautify_js
     )
-    filtered_broken = filter_content_for_diff(
-        normalized_broken, working_url, broken_url
+    return _diff_text(
+        filtered_working,
+        filtered_broken,
+        fromfile=f"working_{file_name}",
+        tofile=f"broken_{file_name}",
     )
 
-    file_diff = list(
-        difflib.unified_diff(
-            filtered_working.splitlines(keepends=True),
-            filtered_broken.splitlines(keepends=True),
-            fromfile=f"working_{file_name}",
-            tofile=f"broken_{file_name}",
-        )
+
+def _diff_text_file_pairs(
+    names, working_map, broken_map, content_type, working_url, broken_url
+):
+    """Diffs several paired text files, in worker processes for JavaScript.
+
+    Beautifying JavaScript is pure Python and holds the GIL, so when more than
+    one script pair needs diffing and together they exceed
+    JS_PROCESS_POOL_MIN_SIZE, the work is spread over a process pool.
+
+    Args:
+        names: Basenames present in both working_map and broken_map.
+        working_map: Dictionary mapping basenames to working file paths.
+        broken_map: Dictionary mapping basenames to broken file paths.
+        content_type: Type of content ('css' or 'js').
+        working_url: URL of the working page.
+        broken_url: URL of the broken page.
+
+    Returns:
+        Dictionary mapping each basename to its diff text ('' if identical).
+    """
+    file_diffs = dict.fromkeys(names, "")
+    pending_names = [
+        name
+        for name in names
+        if not _have_identical_download_hashes(working_map[name], broken_map[name])
+    ]
+    diff_args = (
+        [working_map[name] for name in pending_names],
+        [broken_map[name] for name in pending_names],
+        pending_names,
+        repeat(content_type),
+        repeat(working_url),
+        repeat(broken_url),
+    )
+    pending_size = sum(
+        os.path.getsize(working_map[name]) + os.path.getsize(broken_map[name])
+        for name in pending_names
     )
+    if (
+        content_type == "js"
+        and len(pending_names) > 1
+        and pending_size > JS_PROCESS_POOL_MIN_SIZE
+    ):
+        max_workers = min(len(pending_names), os.cpu_count() or 1)
+        # Forking would copy a process already running the download and
+        # comparison threads, which can deadlock the child
+        with ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            file_diffs.update(
+                zip(pending_names, executor.map(_diff_text_files, *diff_args))
+            )
+    else:
+        file_diffs.update(zip(pending_names, map(_diff_text_files, *diff_args)))
+    return file_diffs
 
+
+def _record_text_file_diff(file_name, content_type, file_diff, results_list):
+    """Records the outcome of a text file comparison.
+
+    Args:
+        file_name: Name of the file that was compared.
+        content_type: Type of content ('css' or 'js').
+        file_diff: The unified diff text, empty if the files do not differ.
+        results_list: List to append diff results to.
+    """
     if file_diff:
-        results_list.append({"file": file_name, "diff": "".join(file_diff)})
+        results_list.append({"file": file_name, "diff": file_diff})
         logger.info("  Differences found in %s: %s", content_type.upper(), file_name)
     else:
         logger.info("  No differences found in %s: %s", content_type.upper(), file_name)
@@ -786,20 +1609,26 @@ def _compare_css_files(
     broken_css_map = _create_file_map(broken_files["css"])
 
     all_css_names = sorted(set(working_css_map.keys()) | set(broken_css_map.keys()))
+    css_diffs = _diff_text_file_pairs(
+        [
+            name
+            for name in all_css_names
+            if name in working_css_map and name in broken_css_map
+        ],
+        working_css_map,
+        broken_css_map,
+        "css",
+        working_url,
+        broken_url,
+    )
 
     for css_name in all_css_names:
         working_css_path = working_css_map.get(css_name)
         broken_css_path = broken_css_map.get(css_name)
 
         if working_css_path and broken_css_path:
-            _compare_single_text_file(
-                working_css_path,
-                broken_css_path,
-                css_name,
-                "css",
-                working_url,
-                broken_url,
-                diff_results["css"],
+            _record_text_file_diff(
+                css_name, "css", css_diffs[css_name], diff_results["css"]
             )
         elif working_css_path:
             diff_results["css"].append(
@@ -830,21 +1659,25 @@ def _compare_js_files(
     broken_js_map = _create_file_map(broken_files["js"])
 
     all_js_names = sorted(set(working_js_map.keys()) | set(broken_js_map.keys()))
+    js_diffs = _diff_text_file_pairs(
+        [
+            name
+            for name in all_js_names
+            if name in working_js_map and name in broken_js_map
+        ],
+        working_js_map,
+        broken_js_map,
+        "js",
+        working_url,
+        broken_url,
+    )
 
     for js_name in all_js_names:
         working_js_path = working_js_map.get(js_name)
         broken_js_path = broken_js_map.get(js_name)
 
         if working_js_path and broken_js_path:
-            _compare_single_text_file(
-                working_js_path,
-                broken_js_path,
-                js_name,
-                "js",
-                working_url,
-                broken_url,
-                diff_results["js"],
-            )
+            _record_text_file_diff(js_name, "js", js_diffs[js_name], diff_results["js"])
         elif working_js_path:
             diff_results["js"].append({"file": js_name, "status": "missing in broken"})
             logger.info("  JS file %s is missing in broken.", js_name)
@@ -883,15 +1716,18 @@ def _separate_image_types(image_list):
     Returns:
         Tuple of (regular_images list, data_uri_images list).
     """
-    regular_images = [f for f in image_list if isinstance(f, str)]
-    data_uris = [
-        f for f in image_list if isinstance(f, dict) and f.get("type") == "data_uri"
-    ]
+    regular_images = []
+    data_uris = []
+    for f in image_list:
+        if isinstance(f, str):
+            regular_images.append(f)
+        elif isinstance(f, dict) and f.get("type") == "data_uri":
+            data_uris.append(f)
     return regular_images, data_uris
 
 
 def _compare_regular_images(working_images, broken_images, diff_results):
-    """Compares regular image files by hash.
+    """Compares regular image files byte-for-byte, reporting hashes for mismatches.
 
     Args:
         working_images: List of working image file paths.
@@ -901,49 +1737,146 @@ def _compare_regular_images(working_images, broken_images, diff_results):
     working_image_map = _create_file_map(working_images)
     broken_image_map = _create_file_map(broken_images)
 
-    working_image_hashes = {
-        name: {"path": path, "hash": calculate_file_hash(path)}
-        for name, path in working_image_map.items()
-    }
-    broken_image_hashes = {
-        name: {"path": path, "hash": calculate_file_hash(path)}
-        for name, path in broken_image_map.items()
-    }
-
     all_image_names = sorted(
-        set(working_image_hashes.keys()) | set(broken_image_hashes.keys())
+        set(working_image_map.keys()) | set(broken_image_map.keys())
+    )
+    paired_names = [
+        name
+        for name in all_image_names
+        if name in working_image_map and name in broken_image_map
+    ]
+    identical_names = _find_identical_files(
+        paired_names, working_image_map, broken_image_map
+    )
+
+    # Only mismatched images are hashed, since the report shows their digests
+    mismatched_names = [name for name in paired_names if name not in identical_names]
+    working_image_hashes, broken_image_hashes = _hash_files(
+        {name: working_image_map[name] for name in mismatched_names},
+        {name: broken_image_map[name] for name in mismatched_names},
     )
 
+    # Checked once, since most images of similar pages are usually identical
+    log_identical = logger.isEnabledFor(logging.INFO)
     for img_name in all_image_names:
-        working_img_info = working_image_hashes.get(img_name)
-        broken_img_info = broken_image_hashes.get(img_name)
+        working_img_path = working_image_map.get(img_name)
+        broken_img_path = broken_image_map.get(img_name)
 
-        if working_img_info and broken_img_info:
-            if working_img_info["hash"] != broken_img_info["hash"]:
+        if working_img_path and broken_img_path:
+            if img_name not in identical_names:
                 diff_results["images"].append(
                     {
                         "file": img_name,
                         "status": "hash mismatch",
-                        "working_hash": working_img_info["hash"],
-                        "broken_hash": broken_img_info["hash"],
+                        "working_hash": working_image_hashes[img_name]["hash"],
+                        "broken_hash": broken_image_hashes[img_name]["hash"],
                     }
                 )
                 logger.info("  Image hash mismatch for: %s", img_name)
             else:
                 diff_results["images"].append({"file": img_name, "status": "identical"})
-                logger.info("  Images are identical: %s", img_name)
-        elif working_img_info:
+                if log_identical:
+                    logger.info("  Images are identical: %s", img_name)
+        elif working_img_path:
             diff_results["images"].append(
                 {"file": img_name, "status": "missing in broken"}
             )
             logger.info("  Image missing in broken: %s", img_name)
-        elif broken_img_info:
+        elif broken_img_path:
             diff_results["images"].append(
                 {"file": img_name, "status": "missing in working"}
             )
             logger.info("  Image missing in working: %s", img_name)
 
 
+def _find_identical_files(names, working_map, broken_map):
+    """Finds which paired files have byte-identical content.
+
+    Pairs downloaded in this run are decided by the digests recorded while
+    downloading. The rest go through filecmp, which rejects files of different
+    sizes from a stat call alone and stops reading at the first differing block,
+    so no file is hashed here.
+
+    Args:
+        names: Basenames present in both working_map and broken_map.
+        working_map: Dictionary mapping basenames to working file paths.
+        broken_map: Dictionary mapping basenames to broken file paths.
+
+    Returns:
+        A set of the basenames whose working and broken files are identical.
+    """
+    # Pairs whose digests were recorded while downloading need no file reads
+    identical = set()
+    unhashed_names = []
+    for name in names:
+        working_hash = _download_hashes.get(working_map[name])
+        broken_hash = _download_hashes.get(broken_map[name])
+        if working_hash and broken_hash:
+            if working_hash == broken_hash:
+                identical.add(name)
+        else:
+            unhashed_names.append(name)
+    if not unhashed_names:
+        return identical
+    with ThreadPoolExecutor() as executor:
+        outcomes = executor.map(
+            filecmp.cmp,
+            [working_map[name] for name in unhashed_names],
+            [broken_map[name] for name in unhashed_names],
+            repeat(False),
+        )
+        identical.update(name for name, same in zip(unhashed_names, outcomes) if same)
+    return identical
+
+
+def _hash_files(*file_maps):
+    """Hashes the files of several basename-to-path maps concurrently.
+
+    All files go through one pool, so the second map's files do not wait for
+    the slowest file of the first.
+
+    Args:
+        *file_maps: Dictionaries mapping file basenames to their full paths.
+
+    Returns:
+        A list with, for each map, a dictionary mapping each basename to a dict
+        with its 'path' and 'hash'.
+    """
+    items = [item for file_map in file_maps for item in file_map.items()]
+    if not items:
+        return [{} for _ in file_maps]
+    # hashlib releases the GIL while hashing, so threads scale across files
+    with ThreadPoolExecutor() as executor:
+        file_hashes = iter(executor.map(_file_hash, [path for _, path in items]))
+        return [
+            {
+                name: {"path": path, "hash": next(file_hashes)}
+                for name, path in file_map.items()
+            }
+            for file_map in file_maps
+        ]
+
+
+def _file_hash(filepath):
+    """Returns a file's digest, reusing the one recorded while downloading it."""
+    return _download_hashes.get(filepath) or calculate_file_hash(
+        filepath, DOWNLOAD_HASH_ALGORITHM
+    )
+
+
+def _have_identical_download_hashes(working_path, broken_path):
+    """Checks whether two files were downloaded with the same content this run."""
+    working_hash = _download_hashes.get(working_path)
+    return bool(working_hash) and working_hash == _download_hashes.get(broken_path)
+
+
+def _data_uri_preview(data_uri):
+    """Shortens a data URI to DATA_URI_PREVIEW_LENGTH characters for the report."""
+    if len(data_uri) <= DATA_URI_PREVIEW_LENGTH:
+        return data_uri
+    return data_uri[:DATA_URI_PREVIEW_LENGTH] + "..."
+
+
 def _compare_data_uri_images(working_data_uris, broken_data_uris, diff_results):
     """Compares data URI images by content.
 
@@ -959,6 +1892,7 @@ def _compare_data_uri_images(working_data_uris, broken_data_uris, diff_results):
         set(working_data_uri_map.keys()) | set(broken_data_uri_map.keys())
     )
 
+    log_identical = logger.isEnabledFor(logging.INFO)
     for data_uri_name in all_data_uri_names:
         working_uri = working_data_uri_map.get(data_uri_name)
         broken_uri = broken_data_uri_map.get(data_uri_name)
@@ -972,22 +1906,15 @@ def _compare_data_uri_images(working_data_uris, broken_data_uris, diff_results):
                         "data_uri": working_uri["content"],
                     }
                 )
-                logger.info("  Data URI Images are identical: %s", data_uri_name)
+                if log_identical:
+                    logger.info("  Data URI Images are identical: %s", data_uri_name)
             else:
                 diff_results["images"].append(
                     {
                         "file": data_uri_name,
                         "status": "hash mismatch (data URI)",
-                        "working_data_uri": (
-                            working_uri["content"][:DATA_URI_PREVIEW_LENGTH] + "..."
-                            if len(working_uri["content"]) > DATA_URI_PREVIEW_LENGTH
-                            else working_uri["content"]
-                        ),
-                        "broken_data_uri": (
-                            broken_uri["content"][:DATA_URI_PREVIEW_LENGTH] + "..."
-                            if len(broken_uri["content"]) > DATA_URI_PREVIEW_LENGTH
-                            else broken_uri["content"]
-                        ),
+                        "working_data_uri": _data_uri_preview(working_uri["content"]),
+                        "broken_data_uri": _data_uri_preview(broken_uri["content"]),
                     }
                 )
                 logger.info("  Data URI Images differ: %s", data_uri_name)
@@ -1070,6 +1997,80 @@ def _validate_html_files(working_files, broken_files, working_url, broken_url):
     return True
 
 
+def _scrape_pages(working_url, broken_url, output_dir, revalidate=False):
+    """Scrapes the working and broken pages, concurrently when it is safe.
+
+    Both pages are saved under a directory named after their hostname, so pages
+    on the same host are scraped one after the other to keep them from writing
+    the same files at the same time.
+
+    Args:
+        working_url: The URL of the working page.
+        broken_url: The URL of the broken page.
+        output_dir: The directory where downloaded resources will be stored.
+        revalidate: Passed on to scrape_page.
+
+    Returns:
+        A (working_files, broken_files) tuple of scrape_page results.
+    """
+    # One session for both pages, so connections opened for one are reused
+    # by the other wherever they share an origin
+    session = _create_session()
+    # Resources referenced by both pages under the same URL are downloaded once
+    url_cache = {}
+    if urlparse(working_url).hostname == urlparse(broken_url).hostname:
+        logger.info("Fetching resources for working page...")
+        working_files = scrape_page(
+            working_url, output_dir, session, url_cache, revalidate
+        )
+        logger.info("Fetching resources for broken page...")
+        broken_files = scrape_page(
+            broken_url, output_dir, session, url_cache, revalidate
+        )
+        return working_files, broken_files
+
+    logger.info("Fetching resources for working and broken pages...")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        working_future = executor.submit(
+            scrape_page, working_url, output_dir, session, url_cache, revalidate
+        )
+        broken_future = executor.submit(
+            scrape_page, broken_url, output_dir, session, url_cache, revalidate
+        )
+        return working_future.result(), broken_future.result()
+
+
+def _run_comparisons(working_files, broken_files, working_url, broken_url):
+    """Runs the HTML, CSS, JS and image comparisons concurrently.
+
+    Each comparison only appends to its own diff_results list, so they can
+    share the dictionary without locking.
+
+    Args:
+        working_files: Dictionary containing paths to working page resources.
+        broken_files: Dictionary containing paths to broken page resources.
+        working_url: URL of the working page.
+        broken_url: URL of the broken page.
+
+    Returns:
+        A dictionary of diff results for HTML, CSS, JS, and images.
+    """
+    diff_results = {"html": [], "css": [], "js": [], "images": []}
+    text_args = (working_files, broken_files, working_url, broken_url, diff_results)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(_compare_html, *text_args),
+            executor.submit(_compare_css_files, *text_args),
+            executor.submit(_compare_js_files, *text_args),
+            executor.submit(
+                _compare_image_files, working_files, broken_files, diff_results
+            ),
+        ]
+        for future in futures:
+            future.result()
+    return diff_results
+
+
 def main():
     """Main entry point for the mega diff tool."""
     parser = argparse.ArgumentParser(
@@ -1088,17 +2089,20 @@ def main():
         action="store_true",
         help="Enable verbose (debug) logging.",
     )
+    parser.add_argument(
+        "--revalidate",
+        action="store_true",
+        help="Revalidate resources cached by earlier runs even while still fresh.",
+    )
     args = parser.parse_args()
 
     _setup_logging(args.verbose)
 
     os.makedirs(args.output, exist_ok=True)
 
-    logger.info("Fetching resources for working page...")
-    working_files = scrape_page(args.working_url, args.output)
-
-    logger.info("Fetching resources for broken page...")
-    broken_files = scrape_page(args.broken_url, args.output)
+    working_files, broken_files = _scrape_pages(
+        args.working_url, args.broken_url, args.output, args.revalidate
+    )
 
     _print_comparison_summary(working_files, broken_files)
 
@@ -1107,18 +2111,9 @@ def main():
     ):
         exit(1)
 
-    diff_results = {"html": [], "css": [], "js": [], "images": []}
-
-    _compare_html(
-        working_files, broken_files, args.working_url, args.broken_url, diff_results
-    )
-    _compare_css_files(
-        working_files, broken_files, args.working_url, args.broken_url, diff_results
-    )
-    _compare_js_files(
-        working_files, broken_files, args.working_url, args.broken_url, diff_results
+    diff_results = _run_comparisons(
+        working_files, broken_files, args.working_url, args.broken_url
     )
-    _compare_image_files(working_files, broken_files, diff_results)
 
     report_path = os.path.join(args.output, "mega_diff_report.html")
     generate_html_report(diff_results, report_path)
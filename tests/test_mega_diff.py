@@ -1,10 +1,14 @@
 import unittest
+from concurrent.futures import Future
 import hashlib
+import io
+import json
+import requests
 import tempfile
+import time
 import os
-from unittest.mock import patch, mock_open
+from unittest.mock import MagicMock, patch
 from bs4 import BeautifulSoup
-from bs4.element import Comment
 from mega_diff import (
     _get_file_extension_from_content_type,
     normalize_content,
@@ -13,16 +17,40 @@ from mega_diff import (
     soup_to_dict,
     _create_file_map,
     _format_diff_lines,
+    _unified_diff,
     _compare_single_text_file,
+    _diff_text_file_pairs,
     _separate_image_types,
     _compare_regular_images,
+    _compare_html,
     _compare_data_uri_images,
+    _find_image_urls_in_css,
+    _read_text_file,
+    _collect_page_entries,
+    _collect_images_from_srcset,
+    _parse_html_tree,
+    _fetch_and_save_resource,
+    _fetch_and_save_resources,
+    _freshness_expiry,
+    _load_http_cache,
+    _save_http_cache,
+    _download_hashes,
+    _unordered_digest,
     DATA_URI_PREVIEW_LENGTH,
+    HTTP_CACHE_FILE_NAME,
+    HTML_PARSER,
 )
 
 
 class TestMegaDiff(unittest.TestCase):
 
+    def setUp(self):
+        # Downloads record their digests in a module-level dictionary; keep
+        # each test's entries from leaking into the others
+        patcher = patch.dict("mega_diff._download_hashes", clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_get_file_extension_from_content_type(self):
         self.assertEqual(_get_file_extension_from_content_type("text/html"), "html")
         self.assertEqual(_get_file_extension_from_content_type("text/css"), "css")
@@ -36,19 +64,27 @@ class TestMegaDiff(unittest.TestCase):
         self.assertEqual(_get_file_extension_from_content_type(""), "bin")
 
     def test_normalize_content_html(self):
-        html_content = "<!-- comment -->\n<p>  Hello   World!  </p>\n\n<div>Test</div>"
-        # Expected output after normalization (prettify + strip empty lines)
-        # The actual output of prettify can vary slightly, so we normalize the expected string too
-        soup = BeautifulSoup(html_content, "html.parser")
-        for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
-            comment.extract()
-        prettified_html = soup.prettify()
-        normalized_lines = [
-            line.strip() for line in prettified_html.splitlines() if line.strip()
+        """Test HTML is prettified one node per line, without comments."""
+        cases = [
+            (
+                "<!-- comment -->\n<p>  Hello   World!  </p>\n\n<div>Test</div>",
+                "<html>\n<body>\n<p>\nHello   World!\n</p>\n<div>\nTest\n</div>\n"
+                "</body>\n</html>",
+            ),
+            (
+                '<ul>\n  <li><a href="/a">A</a></li>\n  <li>B &amp; C</li>\n</ul>',
+                '<html>\n<body>\n<ul>\n<li>\n<a href="/a">\nA\n</a>\n</li>\n<li>\n'
+                "B &amp; C\n</li>\n</ul>\n</body>\n</html>",
+            ),
+            (
+                '<div class="x"><!-- gone --><img src="a.png" alt=""><br></div>',
+                '<html>\n<body>\n<div class="x">\n<img alt="" src="a.png"/>\n<br/>\n'
+                "</div>\n</body>\n</html>",
+            ),
         ]
-        expected_html = "\n".join(normalized_lines)
-
-        self.assertEqual(normalize_content(html_content, "html"), expected_html)
+        for html_content, expected_html in cases:
+            with self.subTest(html_content=html_content):
+                self.assertEqual(normalize_content(html_content, "html"), expected_html)
 
     def test_normalize_content_css(self):
         css_content = (
@@ -67,20 +103,47 @@ class TestMegaDiff(unittest.TestCase):
             "console.log('hello');", normalized_js
         )  # Changed to single quotes
 
-    @patch("builtins.open", new_callable=mock_open)
-    @patch("os.path.exists", return_value=True)
-    def test_calculate_file_hash(self, mock_exists, mock_file):
-        mock_file.return_value.read.side_effect = [b"test content", b""]
-        self.assertEqual(
-            calculate_file_hash("/fake/path/file.txt"),
-            hashlib.md5(b"test content").hexdigest(),
-        )
+    @patch("mega_diff.JS_BEAUTIFY_MAX_SIZE", 10)
+    def test_normalize_content_large_js(self):
+        """Test normalize_content splits large JS per statement without jsbeautifier."""
+        js_content = "function a(){var x=1;  return x;}a();"
+        with patch("mega_diff.beautify") as mock_beautify:
+            normalized_js = normalize_content(js_content, "js")
+        mock_beautify.assert_not_called()
+        self.assertEqual(normalized_js, "function a(){\nvar x=1;\nreturn x;\n}\na();")
 
-        mock_file.return_value.read.side_effect = [b"test content", b""]
-        self.assertEqual(
-            calculate_file_hash("/fake/path/file.txt", "sha256"),
-            hashlib.sha256(b"test content").hexdigest(),
-        )
+    def test_calculate_file_hash(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "file.txt")
+            with open(file_path, "wb") as f:
+                f.write(b"test content")
+
+            self.assertEqual(
+                calculate_file_hash(file_path),
+                hashlib.sha256(b"test content").hexdigest(),
+            )
+            self.assertEqual(
+                calculate_file_hash(file_path, "md5"),
+                hashlib.md5(b"test content").hexdigest(),
+            )
+
+            empty_path = os.path.join(tmpdir, "empty.txt")
+            open(empty_path, "wb").close()
+            self.assertEqual(
+                calculate_file_hash(empty_path), hashlib.sha256(b"").hexdigest()
+            )
+
+    def test_read_text_file(self):
+        """Test _read_text_file decodes UTF-8 and translates newlines."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "file.txt")
+            with open(file_path, "wb") as f:
+                f.write("caf\u00e9\r\nline2\rline3\n".encode("utf-8"))
+            empty_path = os.path.join(tmpdir, "empty.txt")
+            open(empty_path, "wb").close()
+
+            self.assertEqual(_read_text_file(file_path), "caf\u00e9\nline2\nline3\n")
+            self.assertEqual(_read_text_file(empty_path), "")
 
     def test_filter_content_for_diff(self):
         content = "https://dev.example.com/path?ver=1.0.0 and http://prod.example.com/image.jpg"
@@ -103,6 +166,307 @@ class TestMegaDiff(unittest.TestCase):
             expected_wp,
         )
 
+    @patch("mega_diff._fetch_and_save_resource")
+    def test_fetch_and_save_resources_dedupes_urls(self, mock_fetch):
+        """Test _fetch_and_save_resources fetches each URL only once."""
+        mock_fetch.side_effect = lambda url, *args: url + ".saved"
+        cached = Future()
+        cached.set_result("/tmp/cached/a.png")
+        url_cache = {"https://example.com/a.png": (cached, "/tmp")}
+
+        result = _fetch_and_save_resources(
+            [
+                "https://example.com/a.png",
+                "https://example.com/b.png",
+                "https://example.com/b.png",
+            ],
+            None,
+            "/tmp",
+            url_cache,
+        )
+
+        self.assertEqual(
+            result,
+            [
+                "/tmp/cached/a.png",
+                "https://example.com/b.png.saved",
+                "https://example.com/b.png.saved",
+            ],
+        )
+        mock_fetch.assert_called_once_with(
+            "https://example.com/b.png", None, "/tmp", False, None
+        )
+
+    def test_fetch_and_save_resources_copies_other_page_download(self):
+        """Test a resource downloaded for the other page is copied, not refetched."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            working_dir = os.path.join(tmpdir, "working")
+            broken_dir = os.path.join(tmpdir, "broken")
+            source_path = os.path.join(working_dir, "js", "lib.js")
+            os.makedirs(os.path.dirname(source_path))
+            with open(source_path, "w") as f:
+                f.write("var lib;")
+            downloaded = Future()
+            downloaded.set_result(source_path)
+            url_cache = {"https://cdn.example.com/js/lib.js": (downloaded, working_dir)}
+
+            with patch("mega_diff._fetch_and_save_resource") as mock_fetch:
+                result = _fetch_and_save_resources(
+                    ["https://cdn.example.com/js/lib.js"], None, broken_dir, url_cache
+                )
+
+            copied_path = os.path.join(broken_dir, "js", "lib.js")
+            self.assertEqual(result, [copied_path])
+            with open(copied_path) as f:
+                self.assertEqual(f.read(), "var lib;")
+            mock_fetch.assert_not_called()
+
+    def test_fetch_and_save_resources_query_urls_share_save_path(self):
+        """Test URLs saved to the same file are not written into it concurrently."""
+
+        def fake_get(url, **kwargs):
+            response = MagicMock()
+            response.status_code = 200
+            response.headers = {"Content-Type": "image/png"}
+            marker = url[-1].encode()
+
+            def iter_content(chunk_size):
+                # Chunks larger than the write buffer go straight to the file;
+                # "a" arrives in one late burst, "b" trickles in around it
+                if marker == b"a":
+                    time.sleep(0.05)
+                for _ in range(8):
+                    if marker == b"b":
+                        time.sleep(0.02)
+                    yield marker * (io.DEFAULT_BUFFER_SIZE + 1)
+
+            response.iter_content.side_effect = iter_content
+            return response
+
+        session = MagicMock()
+        session.get.side_effect = fake_get
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = _fetch_and_save_resources(
+                [
+                    "https://example.com/_next/image.png?url=a",
+                    "https://example.com/_next/image.png?url=b",
+                ],
+                session,
+                tmpdir,
+                {},
+            )
+
+            self.assertEqual(paths[0], paths[1])
+            with open(paths[0], "rb") as f:
+                content = f.read()
+            size = 8 * (io.DEFAULT_BUFFER_SIZE + 1)
+            self.assertIn(content, (b"a" * size, b"b" * size))
+            self.assertEqual(_download_hashes[paths[0]], calculate_file_hash(paths[0]))
+
+    def test_fetch_and_save_resource_not_modified(self):
+        """Test a 304 response to a conditional request reuses the cached file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cached_path = os.path.join(tmpdir, "logo.png")
+            with open(cached_path, "wb") as f:
+                f.write(b"cached")
+            url = "https://example.com/logo.png"
+            http_cache = {
+                url: {
+                    "etag": '"abc"',
+                    "last_modified": None,
+                    "path": cached_path,
+                    "size": 6,
+                    "hash": calculate_file_hash(cached_path),
+                    "hash_algorithm": "sha256",
+                    "encoding": None,
+                }
+            }
+            session = MagicMock()
+            session.get.return_value.status_code = 304
+
+            result = _fetch_and_save_resource(
+                url, session, tmpdir, http_cache=http_cache
+            )
+
+        self.assertEqual(result, cached_path)
+        session.get.assert_called_once_with(
+            url, stream=True, headers={"If-None-Match": '"abc"'}
+        )
+        session.get.return_value.iter_content.assert_not_called()
+
+    def test_collect_page_entries(self):
+        """Test _collect_page_entries groups entries by source in document order."""
+        root = _parse_html_tree(
+            b"<link rel='stylesheet' href='/site.css'><link rel='icon' href='i.ico'>"
+            b"<script src='app.js'></script><script>inline()</script>"
+            b"<div style=\"background-image: url('bg.png')\">"
+            b"<svg><use href='/sprites.svg#icon'></use></svg>"
+            b"<picture><source srcset='wide.png 2x, narrow.png 1x'>"
+            b"<img src='fallback.png'></picture>"
+            b"<img src='data:image/png;base64,AAAA' data-src='lazy.png'>"
+            b"</div>"
+        )
+
+        css_urls, result = _collect_page_entries(root, "https://example.com/")
+
+        self.assertEqual(css_urls, ["https://example.com/site.css"])
+        self.assertEqual(
+            result,
+            [
+                ("js", "https://example.com/app.js"),
+                ("images", "https://example.com/fallback.png"),
+                ("data_uri", "data:image/png;base64,AAAA"),
+                ("images", "https://example.com/lazy.png"),
+                ("images", "https://example.com/wide.png"),
+                ("images", "https://example.com/narrow.png"),
+                ("images", "https://example.com/bg.png"),
+                ("images", "https://example.com/sprites.svg"),
+            ],
+        )
+
+    def test_parse_html_tree_unknown_charset(self):
+        """Test an unknown declared charset falls back to detecting the encoding."""
+        for encoding in ("utf8mb4", "bogus", "x-user-defined"):
+            with self.subTest(encoding=encoding):
+                root = _parse_html_tree(b"<img src='a.png'>", encoding)
+                self.assertEqual(root.find(".//img").get("src"), "a.png")
+
+    def test_fetch_and_save_resource_fresh_in_cache(self):
+        """Test a cached resource within its max-age is reused without a request."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cached_path = os.path.join(tmpdir, "app.js")
+            with open(cached_path, "wb") as f:
+                f.write(b"cached")
+            url = "https://example.com/app.js"
+            http_cache = {
+                url: {
+                    "etag": None,
+                    "last_modified": None,
+                    "expires": time.time() + 60,
+                    "path": cached_path,
+                    "size": 6,
+                    "hash": calculate_file_hash(cached_path),
+                    "hash_algorithm": "sha256",
+                    "encoding": None,
+                }
+            }
+            session = MagicMock()
+
+            result = _fetch_and_save_resource(
+                url, session, tmpdir, return_content=True, http_cache=http_cache
+            )
+
+        self.assertEqual(result, (cached_path, b"cached", None))
+        session.get.assert_not_called()
+
+    def test_fetch_and_save_resource_revalidates_fresh_or_changed_entries(self):
+        """Test fresh entries are revalidated on request, changed files refetched."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cached_path = os.path.join(tmpdir, "app.js")
+            with open(cached_path, "wb") as f:
+                f.write(b"cached")
+            url = "https://example.com/app.js"
+            entry = {
+                "etag": '"abc"',
+                "last_modified": None,
+                "expires": time.time() + 60,
+                "path": cached_path,
+                "size": 6,
+                "hash": calculate_file_hash(cached_path),
+                "hash_algorithm": "sha256",
+                "encoding": None,
+            }
+            session = MagicMock()
+            session.get.return_value.status_code = 304
+
+            _fetch_and_save_resource(
+                url, session, tmpdir, http_cache={url: entry}, revalidate=True
+            )
+            session.get.assert_called_once_with(
+                url, stream=True, headers={"If-None-Match": '"abc"'}
+            )
+
+            # A file whose size no longer matches is fetched unconditionally
+            session.reset_mock()
+            session.get.side_effect = requests.exceptions.ConnectionError("down")
+            _fetch_and_save_resource(
+                url, session, tmpdir, http_cache={url: dict(entry, size=5)}
+            )
+            session.get.assert_called_once_with(url, stream=True, headers=None)
+
+            # So is a file rewritten with different content of the same size
+            session.reset_mock()
+            with open(cached_path, "wb") as f:
+                f.write(b"edited")
+            _fetch_and_save_resource(url, session, tmpdir, http_cache={url: entry})
+            session.get.assert_called_once_with(url, stream=True, headers=None)
+
+    def test_http_cache_paths_relative_to_page_dir(self):
+        """Test cached paths are saved relative to the page directory."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            page_dir = os.path.join(tmpdir, "example.com")
+            os.makedirs(page_dir)
+            url = "https://example.com/app.js"
+            cached_path = os.path.join(page_dir, "script.js")
+
+            _save_http_cache(page_dir, {url: {"etag": '"abc"', "path": cached_path}})
+            with open(os.path.join(page_dir, HTTP_CACHE_FILE_NAME)) as f:
+                self.assertEqual(json.load(f)[url]["path"], "script.js")
+
+            self.assertEqual(_load_http_cache(page_dir)[url]["path"], cached_path)
+
+    def test_freshness_expiry(self):
+        """Test _freshness_expiry honors max-age, Age and no-cache."""
+        response = MagicMock()
+        response.headers = {"Cache-Control": "public, max-age=100", "Age": "40"}
+        with patch("mega_diff.time.time", return_value=1000.0):
+            self.assertEqual(_freshness_expiry(response), 1060.0)
+
+        response.headers = {"Cache-Control": "max-age=100, no-cache"}
+        self.assertIsNone(_freshness_expiry(response))
+
+        response.headers = {}
+        self.assertIsNone(_freshness_expiry(response))
+
+    def test_collect_images_from_srcset(self):
+        """Test srcset parsing drops descriptors, empty candidates and data URIs."""
+        self.assertEqual(
+            _collect_images_from_srcset(
+                "a.png 1x, , b.png 200w,data:image/png 3x", "https://example.com/"
+            ),
+            [
+                ("images", "https://example.com/a.png"),
+                ("images", "https://example.com/b.png"),
+            ],
+        )
+        self.assertEqual(_collect_images_from_srcset("  ", "https://example.com/"), [])
+
+    def test_find_image_urls_in_css(self):
+        """Test _find_image_urls_in_css resolves quoted and unquoted url() values."""
+        css_content = (
+            ".a { background: url('/img/a.png'); }\n"
+            '.b { background-image: url( "b.png" ); }\n'
+            ".c { background: url(../img/c.png) no-repeat; }\n"
+            ".d { background: url(data:image/png;base64,AAAA); }"
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            css_path = os.path.join(tmpdir, "style.css")
+            with open(css_path, "w") as f:
+                f.write(css_content)
+
+            result = _find_image_urls_in_css(
+                css_path, "https://example.com/css/style.css"
+            )
+
+        self.assertEqual(
+            result,
+            [
+                "https://example.com/img/a.png",
+                "https://example.com/css/b.png",
+                "https://example.com/img/c.png",
+            ],
+        )
+
     def test_generate_html_report_curly_braces(self):
         # Import here to avoid circular import issues
         import tempfile
@@ -151,8 +515,8 @@ class TestMegaDiff(unittest.TestCase):
 
         html1 = '<div class="section-intro__body">Hello</div>'
         html2 = '<div class="section-intro-body">Hello</div>'
-        soup1 = BeautifulSoup(html1, "html.parser")
-        soup2 = BeautifulSoup(html2, "html.parser")
+        soup1 = BeautifulSoup(html1, HTML_PARSER)
+        soup2 = BeautifulSoup(html2, HTML_PARSER)
         dict1 = soup_to_dict(soup1.div)
         dict2 = soup_to_dict(soup2.div)
         diff = DeepDiff(dict1, dict2, ignore_order=True)
@@ -169,8 +533,8 @@ class TestMegaDiff(unittest.TestCase):
 
         html1 = '<div class="outer" id="main"><span class="inner">Text</span></div>'
         html2 = '<div class="outer" id="main"><span class="inner-modified">Text</span></div>'
-        soup1 = BeautifulSoup(html1, "html.parser")
-        soup2 = BeautifulSoup(html2, "html.parser")
+        soup1 = BeautifulSoup(html1, HTML_PARSER)
+        soup2 = BeautifulSoup(html2, HTML_PARSER)
         dict1 = soup_to_dict(soup1.div)
         dict2 = soup_to_dict(soup2.div)
         diff = DeepDiff(dict1, dict2, ignore_order=True)
@@ -178,6 +542,18 @@ class TestMegaDiff(unittest.TestCase):
         self.assertIn("inner", str(diff))
         self.assertIn("inner-modified", str(diff))
 
+    def test_unordered_digest_ignores_child_order(self):
+        """Trees that only differ in child order share a digest, others do not."""
+        html1 = '<div class="a b"><p>One</p><span id="x">Two</span></div>'
+        html2 = '<div class="b a"><span id="x">Two</span><p>One</p></div>'
+        html3 = '<div class="a b"><p>One</p><span id="y">Two</span></div>'
+        dicts = [
+            soup_to_dict(BeautifulSoup(h, HTML_PARSER).div)
+            for h in (html1, html2, html3)
+        ]
+        self.assertEqual(_unordered_digest(dicts[0]), _unordered_digest(dicts[1]))
+        self.assertNotEqual(_unordered_digest(dicts[0]), _unordered_digest(dicts[2]))
+
     def test_create_file_map_basic(self):
         """Test _create_file_map with basic file list."""
         file_list = ["/path/to/style.css", "/another/path/main.js", "/home/index.html"]
@@ -238,6 +614,92 @@ class TestMegaDiff(unittest.TestCase):
         self.assertIn('class="diff-removed"', result)
         self.assertIn('class="diff-unchanged"', result)
 
+    def test_diff_text_file_pairs_small_js_in_process(self):
+        """Test small script batches are diffed without starting worker processes."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            working_map, broken_map = {}, {}
+            for name in ("a.js", "b.js"):
+                for side, file_map in (
+                    ("working", working_map),
+                    ("broken", broken_map),
+                ):
+                    path = os.path.join(tmpdir, f"{side}_{name}")
+                    with open(path, "w") as f:
+                        f.write(f"var {side} = 1;\n")
+                    file_map[name] = path
+
+            with patch("mega_diff.ProcessPoolExecutor") as executor:
+                diffs = _diff_text_file_pairs(
+                    ["a.js", "b.js"],
+                    working_map,
+                    broken_map,
+                    "js",
+                    "https://working.com",
+                    "https://broken.com",
+                )
+
+        executor.assert_not_called()
+        self.assertIn("+var broken = 1;", diffs["a.js"])
+        self.assertIn("+var broken = 1;", diffs["b.js"])
+
+    def test_unified_diff_round_trip(self):
+        """Test applying _unified_diff's output to the original gives the changed lines.
+
+        Trimming the shared ends can make SequenceMatcher align repeated lines
+        differently from difflib, so the hunks are not always byte-identical
+        to difflib's; they must still describe the same change.
+        """
+        import random
+
+        rng = random.Random(0)
+        for case in range(500):
+            working = [f"{rng.choice('abc')}\n" for _ in range(rng.randint(0, 12))]
+            broken = list(working)
+            for _ in range(rng.randint(1, 3)):
+                i = rng.randint(0, len(broken))
+                if broken and rng.random() < 0.5:
+                    del broken[min(i, len(broken) - 1)]
+                else:
+                    broken.insert(i, f"{rng.choice('abcd')}\n")
+            with self.subTest(case=case):
+                diff = list(_unified_diff(working, broken))
+                self.assertEqual(self._apply_unified_diff(working, diff), broken)
+
+    @staticmethod
+    def _apply_unified_diff(lines, diff):
+        """Applies unified diff lines to a list of lines."""
+        result = []
+        position = 0
+        for line in diff[2:]:
+            if line.startswith("@@"):
+                start, _, length = line.split()[1][1:].partition(",")
+                # An empty range is reported as the line before it
+                start = int(start) - (length != "0")
+                result += lines[position:start]
+                position = start
+            elif line.startswith("+"):
+                result.append(line[1:])
+            else:
+                position += 1
+                if line.startswith(" "):
+                    result.append(line[1:])
+        return result + lines[position:]
+
+    def test_unified_diff_trimmed_line_numbers(self):
+        """Test _unified_diff reports original line numbers after trimming."""
+        working = [f"line {i}\n" for i in range(100)]
+        broken = list(working)
+        broken[50] = "changed\n"
+        diff = list(_unified_diff(working, broken, "working.js", "broken.js"))
+        self.assertEqual(diff[2], "@@ -48,7 +48,7 @@\n")
+        self.assertIn("-line 50\n", diff)
+        self.assertIn("+changed\n", diff)
+
+    def test_unified_diff_identical(self):
+        """Test _unified_diff yields nothing for identical inputs."""
+        lines = ["same\n", "lines\n"]
+        self.assertEqual(list(_unified_diff(lines, list(lines))), [])
+
     def test_separate_image_types_mixed(self):
         """Test _separate_image_types correctly separates mixed image types."""
         image_list = [
@@ -336,47 +798,171 @@ class TestMegaDiff(unittest.TestCase):
                 f.write("body { color: red; }")
 
             results_list = []
-            _compare_single_text_file(
-                working_path,
-                broken_path,
-                "style.css",
-                "css",
-                "https://working.com",
-                "https://broken.com",
-                results_list,
-            )
+            with patch("mega_diff._prepare_content_for_diff") as mock_prepare:
+                _compare_single_text_file(
+                    working_path,
+                    broken_path,
+                    "style.css",
+                    "css",
+                    "https://working.com",
+                    "https://broken.com",
+                    results_list,
+                )
 
             # No difference should be added
             self.assertEqual(len(results_list), 0)
+            # Identical files are not normalized or diffed
+            mock_prepare.assert_not_called()
+
+    @patch("mega_diff.JS_BEAUTIFY_MAX_SIZE", 40)
+    def test_compare_single_text_file_js_straddling_beautify_limit(self):
+        """Test both sides of a pair are normalized alike across the size limit."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            working_path = os.path.join(tmpdir, "working.js")
+            broken_path = os.path.join(tmpdir, "broken.js")
+            with open(working_path, "w") as f:
+                f.write("var a=1;var b=2;var c=3;var d=4;")
+            with open(broken_path, "w") as f:
+                f.write("var a=1;var ee=5;var b=2;var c=3;var d=4;")
+
+            results_list = []
+            with patch("mega_diff.beautify") as mock_beautify:
+                _compare_single_text_file(
+                    working_path,
+                    broken_path,
+                    "app.js",
+                    "js",
+                    "https://working.com",
+                    "https://broken.com",
+                    results_list,
+                )
+
+        mock_beautify.assert_not_called()
+        diff_lines = results_list[0]["diff"].splitlines()
+        self.assertIn("+var ee=5;", diff_lines)
+        self.assertEqual(
+            [line for line in diff_lines[2:] if line[:1] in "+-"], ["+var ee=5;"]
+        )
+
+    def _write_image_pair(self, tmpdir, working_content, broken_content):
+        """Writes working/broken copies of image.jpg and returns their paths."""
+        paths = []
+        for side, content in (("working", working_content), ("broken", broken_content)):
+            os.makedirs(os.path.join(tmpdir, side))
+            path = os.path.join(tmpdir, side, "image.jpg")
+            with open(path, "wb") as f:
+                f.write(content)
+            paths.append(path)
+        return paths
 
     @patch("mega_diff.calculate_file_hash")
     def test_compare_regular_images_identical(self, mock_hash):
         """Test _compare_regular_images with identical images."""
         mock_hash.return_value = "abc123"
-        working_images = ["/path/image.jpg"]
-        broken_images = ["/other/image.jpg"]
-        diff_results = {"images": []}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            working_path, broken_path = self._write_image_pair(
+                tmpdir, b"same bytes", b"same bytes"
+            )
+            diff_results = {"images": []}
 
-        _compare_regular_images(working_images, broken_images, diff_results)
+            _compare_regular_images([working_path], [broken_path], diff_results)
 
         self.assertEqual(len(diff_results["images"]), 1)
         self.assertEqual(diff_results["images"][0]["status"], "identical")
+        # Byte-identical images are not hashed
+        mock_hash.assert_not_called()
 
     @patch("mega_diff.calculate_file_hash")
     def test_compare_regular_images_mismatch(self, mock_hash):
         """Test _compare_regular_images with hash mismatch."""
         mock_hash.side_effect = ["abc123", "def456"]
-        working_images = ["/path/image.jpg"]
-        broken_images = ["/other/image.jpg"]
-        diff_results = {"images": []}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            working_path, broken_path = self._write_image_pair(
+                tmpdir, b"working bytes", b"broken bytes"
+            )
+            diff_results = {"images": []}
 
-        _compare_regular_images(working_images, broken_images, diff_results)
+            _compare_regular_images([working_path], [broken_path], diff_results)
 
         self.assertEqual(len(diff_results["images"]), 1)
         self.assertEqual(diff_results["images"][0]["status"], "hash mismatch")
         self.assertEqual(diff_results["images"][0]["working_hash"], "abc123")
         self.assertEqual(diff_results["images"][0]["broken_hash"], "def456")
 
+    @patch("mega_diff.filecmp.cmp")
+    @patch("mega_diff.calculate_file_hash")
+    def test_compare_regular_images_download_hashes(self, mock_hash, mock_cmp):
+        """Test _compare_regular_images uses digests recorded while downloading."""
+        working_path = "/working/a/logo.png"
+        broken_path = "/broken/b/logo.png"
+        with patch.dict(
+            "mega_diff._download_hashes",
+            {working_path: "abc123", broken_path: "def456"},
+        ):
+            diff_results = {"images": []}
+            _compare_regular_images([working_path], [broken_path], diff_results)
+
+        self.assertEqual(
+            diff_results["images"],
+            [
+                {
+                    "file": "logo.png",
+                    "status": "hash mismatch",
+                    "working_hash": "abc123",
+                    "broken_hash": "def456",
+                }
+            ],
+        )
+        mock_cmp.assert_not_called()
+        mock_hash.assert_not_called()
+
+    @patch("mega_diff._load_html_soup")
+    def test_compare_html_identical_download_hashes(self, mock_load):
+        """Test _compare_html skips parsing pages downloaded with equal content."""
+        working_files = {"html": "/working/a/index.html"}
+        broken_files = {"html": "/broken/b/index.html"}
+        with patch.dict(
+            "mega_diff._download_hashes",
+            {working_files["html"]: "abc123", broken_files["html"]: "abc123"},
+        ):
+            diff_results = {"html": []}
+            _compare_html(
+                working_files,
+                broken_files,
+                "https://a.example/",
+                "https://b.example/",
+                diff_results,
+            )
+
+        self.assertEqual(diff_results["html"], [])
+        mock_load.assert_not_called()
+
+    def test_compare_html_same_save_path(self):
+        """Test pages saved to the same path are still compared by content."""
+        html_path = "/out/index.html"
+        working_files = {
+            "html": html_path,
+            "html_content": b"<p>working</p>",
+            "html_encoding": "utf-8",
+        }
+        broken_files = {
+            "html": html_path,
+            "html_content": b"<p>broken</p>",
+            "html_encoding": "utf-8",
+        }
+        with patch.dict("mega_diff._download_hashes", {html_path: "abc123"}):
+            diff_results = {"html": []}
+            _compare_html(
+                working_files,
+                broken_files,
+                "https://example.com/?a",
+                "https://example.com/?b",
+                diff_results,
+            )
+
+        self.assertEqual(diff_results["html"][0]["type"], "html-semantic")
+        self.assertIn("broken", diff_results["html"][0]["visual"])
+
     @patch("mega_diff.calculate_file_hash")
     def test_compare_regular_images_missing_in_broken(self, mock_hash):
         """Test _compare_regular_images with image missing in broken."""